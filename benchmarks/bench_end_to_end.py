@@ -0,0 +1,167 @@
+"""ローカルのスタブサーバーに対して ModelTracker.run_update を計測するベンチマーク
+
+    python -m benchmarks.bench_end_to_end [--models 10 100 1000] [--hub-latency 0.05]
+
+HF / Notion / Anthropic のスタブサーバーを起動し、Config の接続先を環境変数で
+差し替えた子プロセスで run_update を実行する。モデル数ごとにステージ別の所要時間、
+サービス別のリクエスト数、子プロセスのピーク RSS を出力する。
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.stub_servers import start_stub_servers
+
+STAGES = ["trending", "popular", "snapshot", "analytics", "news_script", "notion_upload", "create_page", "total"]
+
+
+def _timed(obj, attr: str, stage: str, timings: dict):
+    """obj.attr を所要時間を記録するラッパーに差し替える"""
+    func = getattr(obj, attr)
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+    setattr(obj, attr, wrapper)
+
+
+def run_worker(workers: int) -> None:
+    """子プロセス側: 環境変数で差し替えた接続先に対して run_update を1回実行"""
+    import resource  # pylint: disable=import-outside-toplevel
+
+    from instrumentation import metrics  # pylint: disable=import-outside-toplevel
+    from main import ModelTracker  # pylint: disable=import-outside-toplevel
+
+    timings = {}
+    tracker = ModelTracker(workers=workers)
+    _timed(tracker, "get_trending_models", "trending", timings)
+    _timed(tracker.hf_service, "get_popular_models", "popular", timings)
+    _timed(tracker, "_save_snapshots", "snapshot", timings)
+    _timed(tracker, "_annotate_growth", "analytics", timings)
+    _timed(tracker.notion_service, "generate_news_script", "news_script", timings)
+    _timed(tracker.notion_service.uploader, "create_page", "notion_upload", timings)
+    _timed(tracker.notion_service, "create_page", "create_page", timings)
+    _timed(tracker, "run_update", "total", timings)
+
+    tracker.run_update()
+
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    report = metrics.report()
+    print(
+        json.dumps(
+            {
+                "stages": timings,
+                "spans": report["stages"],
+                "counters": report["counters"],
+                "peak_rss_mb": peak_rss_kb / 1024,
+            }
+        )
+    )
+
+
+def run_case(servers: dict, n_models: int, args) -> dict:
+    for server in servers.values():
+        server.reset_counts()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = dict(
+            os.environ,
+            HF_BASE_URL=servers["hub"].url,
+            NOTION_BASE_URL=servers["notion"].url,
+            ANTHROPIC_BASE_URL=servers["anthropic"].url,
+            NOTION_TOKEN="stub",
+            NOTION_DATABASE_ID="stub",
+            ANTHROPIC_API_KEY="stub",
+            MODEL_LIMIT=str(n_models),
+            DATA_DIR=data_dir,
+            HTTP_CACHE_DIR=str(Path(data_dir) / "http"),
+            NOTION_RATE_LIMIT=str(args.notion_rate),
+            TRENDING_SOURCE=args.trending_source,
+        )
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_end_to_end", "--worker", "--workers", str(args.workers)],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+
+    if completed.returncode != 0:
+        raise RuntimeError(f"worker failed for {n_models} models:\n{completed.stderr[-2000:]}")
+
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["requests"] = {name: dict(server.counts) for name, server in servers.items()}
+    result["bytes"] = {name: server.bytes_sent for name, server in servers.items()}
+    return result
+
+
+def print_report(results: dict) -> None:
+    print(f"\n{'models':>7}" + "".join(f"{stage:>14}" for stage in STAGES) + f"{'peak RSS MB':>13}")
+    for n_models, result in results.items():
+        stages = result["stages"]
+        print(
+            f"{n_models:>7}"
+            + "".join(f"{stages.get(stage, 0.0):>13.3f}s" for stage in STAGES)
+            + f"{result['peak_rss_mb']:>13.1f}"
+        )
+
+    print("\nrequests per service")
+    for n_models, result in results.items():
+        for service, counts in result["requests"].items():
+            total = sum(counts.values())
+            detail = ", ".join(f"{route}={count}" for route, count in sorted(counts.items()))
+            print(f"{n_models:>7} {service:<10}{total:>6}  {result['bytes'][service] / 1024:>9.0f} KB  {detail}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="オフライン end-to-end ベンチマーク")
+    parser.add_argument("--models", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--trending-source", choices=["api", "html"], default="api")
+    parser.add_argument("--hub-latency", type=float, default=0.02, help="HF スタブの応答遅延（秒）")
+    parser.add_argument("--notion-latency", type=float, default=0.05, help="Notion スタブの応答遅延（秒）")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Anthropic スタブの応答遅延（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="各スタブが 500 を返す確率")
+    parser.add_argument("--notion-rate", type=float, default=3.0, help="Notion のレート制限（req/s）")
+    parser.add_argument("--fixtures", type=Path, default=None, help="記録済みフィクスチャのディレクトリ")
+    parser.add_argument("--json", type=Path, default=None, help="結果を JSON で保存するパス")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.workers)
+        return
+
+    servers = start_stub_servers(
+        max(args.models),
+        fixtures_dir=args.fixtures,
+        hub_latency=args.hub_latency,
+        notion_latency=args.notion_latency,
+        llm_latency=args.llm_latency,
+        error_rate=args.error_rate,
+    )
+    try:
+        results = {}
+        for n_models in args.models:
+            print(f"running {n_models} models...", flush=True)
+            results[n_models] = run_case(servers, n_models, args)
+    finally:
+        for server in servers.values():
+            server.stop()
+
+    print_report(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
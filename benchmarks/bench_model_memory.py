@@ -0,0 +1,144 @@
+"""モデル表現ごとのメモリ使用量を比較するベンチマーク
+
+    python -m benchmarks.bench_model_memory [--models 100000]
+
+API レスポンス相当の JSON をパースして各表現を構築し、入力を破棄した後に
+保持されているメモリ量（tracemalloc）と構築時間を計測する。
+"""
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from models.huggingface import HuggingFaceModel, ModelCommit
+from models.table import ModelTable
+
+
+# 比較用: slots・インターン・遅延変換を導入する前の表現
+@dataclass
+class LegacyCommit:
+    title: str
+    date: datetime
+    description: Optional[str] = None
+
+
+@dataclass
+class LegacyStats:
+    downloads: int
+    likes: int
+    recent_downloads: Optional[str] = None
+
+
+@dataclass
+class LegacyModel:
+    id: str
+    author: str
+    description: Optional[str]
+    tags: List[str]
+    last_modified: str
+    stats: LegacyStats
+    recent_commits: List[LegacyCommit]
+    trend_reasons: list
+    private: bool = False
+
+
+def synthesize_payload(n_models: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    vocab = [f"tag-{i}" for i in range(500)] + ["transformers", "pytorch", "region:us"]
+    authors = [f"org{i}" for i in range(2000)]
+    items = []
+    for i in range(n_models):
+        author = rng.choice(authors)
+        items.append(
+            {
+                "id": f"{author}/model-{i}",
+                "author": author,
+                "downloads": rng.randint(0, 10_000_000),
+                "likes": rng.randint(0, 5000),
+                "tags": rng.sample(vocab, rng.randint(8, 15)),
+                "lastModified": "2024-05-01T12:00:00.000Z",
+                "private": False,
+                "commits": [
+                    {"title": "Update README.md", "date": f"2024-04-{d:02d}T10:00:00.000Z"}
+                    for d in (1, 2, 3)
+                ],
+            }
+        )
+    return json.dumps(items)
+
+
+def build_legacy(items):
+    models = []
+    for data in items:
+        models.append(
+            LegacyModel(
+                id=data["id"],
+                author=data["author"],
+                description=None,
+                tags=data["tags"],
+                last_modified=data["lastModified"],
+                stats=LegacyStats(data["downloads"], data["likes"]),
+                recent_commits=[
+                    LegacyCommit(
+                        c["title"], datetime.fromisoformat(c["date"].replace("Z", "+00:00"))
+                    )
+                    for c in data["commits"]
+                ],
+                trend_reasons=[],
+            )
+        )
+    return models
+
+
+def build_compact(items):
+    models = []
+    for data in items:
+        model = HuggingFaceModel.from_api_response(data)
+        model.recent_commits = [ModelCommit(c["title"], c["date"]) for c in data["commits"]]
+        models.append(model)
+    return models
+
+
+def build_table(items):
+    return ModelTable.from_api_responses(items)
+
+
+def measure(build, payload: str):
+    gc.collect()
+    tracemalloc.start()
+    items = json.loads(payload)
+    start = time.perf_counter()
+    result = build(items)
+    elapsed = time.perf_counter() - start
+    del items
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="モデル表現のメモリベンチマーク")
+    parser.add_argument("--models", type=int, default=100_000)
+    args = parser.parse_args()
+
+    payload = synthesize_payload(args.models)
+    print(f"# {args.models:,} models")
+    print(f"{'representation':<34}{'build s':>9}{'retained MB':>13}{'peak MB':>10}")
+    for name, build in (
+        ("dataclass (previous)", build_legacy),
+        ("slotted + interned + lazy dates", build_compact),
+        ("ModelTable (array-backed)", build_table),
+    ):
+        result, elapsed, current, peak = measure(build, payload)
+        print(f"{name:<34}{elapsed:>9.2f}{current / 2**20:>13.1f}{peak / 2**20:>10.1f}")
+        del result
+
+
+if __name__ == "__main__":
+    main()
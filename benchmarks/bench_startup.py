@@ -0,0 +1,87 @@
+"""`main.py --check` の起動時間と import されるモジュールを検査するベンチマーク
+
+    python -m benchmarks.bench_startup [--runs 5] [--budget 0.3]
+
+--check を別プロセスで繰り返し実行して所要時間の中央値を計測する。
+中央値が予算を超えた場合、または重い依存（SDK・requests・numpy・bs4）が
+読み込まれた場合は終了コード 1 を返すため、起動時間の回帰検知に使える。
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# --check では読み込まれてはならないモジュール
+HEAVY_MODULES = ["anthropic", "notion_client", "requests", "numpy", "bs4"]
+
+_PROBE = """
+import runpy, sys
+sys.argv = ["main.py", "--check"]
+runpy.run_path("main.py", run_name="__main__")
+print(",".join(name for name in {heavy!r} if name in sys.modules))
+"""
+
+
+def _env() -> dict:
+    # Config.validate() を通すためのダミー値（API は呼び出さない）
+    return dict(os.environ, NOTION_TOKEN="stub", NOTION_DATABASE_ID="stub", ANTHROPIC_API_KEY="stub")
+
+
+def measure(runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "main.py", "--check"],
+            cwd=ROOT,
+            env=_env(),
+            capture_output=True,
+            check=True,
+        )
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def loaded_heavy_modules() -> list:
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(heavy=HEAVY_MODULES)],
+        cwd=ROOT,
+        env=_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    output = completed.stdout.strip().splitlines()
+    return [name for name in (output[-1] if output else "").split(",") if name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="起動時間のベンチマーク")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=0.3, help="中央値の上限（秒）")
+    args = parser.parse_args()
+
+    timings = measure(args.runs)
+    median = statistics.median(timings)
+    heavy = loaded_heavy_modules()
+
+    print(f"main.py --check: median {median:.3f}s, min {min(timings):.3f}s, max {max(timings):.3f}s")
+    print(f"heavy modules loaded: {', '.join(heavy) or 'none'}")
+
+    failures = []
+    if median > args.budget:
+        failures.append(f"中央値 {median:.3f}s が予算 {args.budget:.3f}s を超えました")
+    if heavy:
+        failures.append(f"--check で重いモジュールが読み込まれました: {', '.join(heavy)}")
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
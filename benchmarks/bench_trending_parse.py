@@ -0,0 +1,176 @@
+"""トレンドページのパース方式ごとの処理時間とピークメモリを比較するベンチマーク
+
+保存済みのトレンドページ（benchmarks/fixtures/*.html）を対象に計測し、fast と full の
+抽出結果（モデル ID の並び）が一致するかを検証する（不一致があれば終了コード 1）。
+フィクスチャが無い場合は合成ページを使うが、合成ページは fast のパーサーが想定する
+構造で生成しているため、実ページでの正しさの検証にはならない。実ページは --save-live で保存するか、
+`main.py --record` で記録したアーカイブから --from-archive で取り出す。
+
+    python -m benchmarks.bench_trending_parse [--save-live] [--from-archive PATH] [--repeat 5]
+"""
+import argparse
+import sys
+import html
+import json
+import time
+import tracemalloc
+from pathlib import Path
+from statistics import median
+
+from config import Config
+from services.archive import RunArchive
+from services.scraper import HuggingFaceScraper
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+
+
+def synthesize_trending_page(n_models: int = 30) -> str:
+    """実際のトレンドページと同じ要素構成を持つ合成ページを生成"""
+    models = [
+        {
+            "author": f"org{i % 7}",
+            "downloads": 1000 * (n_models - i),
+            "id": f"org{i % 7}/model-{i}",
+            "lastModified": "2024-05-01T12:00:00.000Z",
+            "likes": 10 * i,
+            "pipeline_tag": "text-generation",
+            "private": False,
+            "repoType": "model",
+        }
+        for i in range(n_models)
+    ]
+    props = html.escape(json.dumps({"initialValues": {"models": models}}), quote=True)
+    filler_svg = "<svg><path d='" + "M0 0L1 1" * 200 + "'></path></svg>"
+
+    cards = []
+    for model in models:
+        cards.append(
+            f"""<article class="overview-card-wrapper group/repo">
+<a class="block p-2" href="/{model['id']}">
+<header class="flex items-center"><h4 class="text-md truncate">{model['id']}</h4></header>
+<div class="mr-1 flex items-center overflow-hidden whitespace-nowrap text-sm">
+{filler_svg}<span class="truncate">Text Generation</span><span>•</span>
+<span>Updated 3 days ago</span><span>•</span>{filler_svg}
+<span>{model['downloads']:,} downloads</span><span>•</span>{filler_svg}<span>{model['likes']}</span>
+</div>
+<div class="model-description line-clamp-2">Synthetic description for {model['id']}</div>
+</a></article>"""
+        )
+
+    head = "<style>" + ".c{color:red}" * 20000 + "</style>"
+    nav = "<nav>" + "<a href='/x'>link</a>" * 2000 + "</nav>"
+    return (
+        f"<!doctype html><html><head>{head}</head><body>{nav}"
+        f'<div class="SVELTE_HYDRATER contents" data-target="ModelList" data-props="{props}">'
+        f"<section>{''.join(cards)}</section></div></body></html>"
+    )
+
+
+def load_fixtures() -> dict:
+    fixtures = {path.name: path.read_text(encoding="utf-8") for path in sorted(FIXTURE_DIR.glob("*.html"))}
+    if not fixtures:
+        fixtures["synthetic.html"] = synthesize_trending_page()
+    return fixtures
+
+
+def save_live_page() -> Path:
+    """現在のトレンドページをフィクスチャとして保存"""
+    scraper = HuggingFaceScraper()
+    response = scraper.http.get(f"{Config.HF_BASE_URL}/models?sort=trending", timeout=30)
+    response.raise_for_status()
+    path = FIXTURE_DIR / f"trending_{time.strftime('%Y%m%d')}.html"
+    path.write_text(response.text, encoding="utf-8")
+    return path
+
+
+def save_archived_pages(archive_path: str) -> list:
+    """記録済みのアーカイブに含まれるトレンドページをフィクスチャとして保存"""
+    archive = RunArchive(archive_path, "replay")
+    paths = []
+    try:
+        for key, meta in archive.index.items():
+            if meta.get("kind") != "http" or not meta["url"].endswith("/models?sort=trending"):
+                continue
+            _, body = archive.replay(key)
+            path = FIXTURE_DIR / f"trending_{Path(archive_path).stem}.html"
+            path.write_text(body.decode(meta.get("encoding") or "utf-8"), encoding="utf-8")
+            paths.append(path)
+    finally:
+        archive.close()
+    return paths
+
+
+def measure(parse, page: str, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parse(page)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    parse(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, median(timings), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="トレンドページのパースベンチマーク")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save-live", action="store_true", help="現在のトレンドページをフィクスチャとして保存")
+    parser.add_argument(
+        "--from-archive", metavar="PATH", help="main.py --record で記録したアーカイブのトレンドページを保存"
+    )
+    args = parser.parse_args()
+
+    if args.save_live:
+        print(f"保存しました: {save_live_page()}")
+    if args.from_archive:
+        paths = save_archived_pages(args.from_archive)
+        if not paths:
+            parser.error(f"{args.from_archive} にトレンドページが記録されていません")
+        print(f"保存しました: {', '.join(map(str, paths))}")
+
+    full = HuggingFaceScraper(parse_mode="full")
+    fast = HuggingFaceScraper(parse_mode="fast")
+    modes = {
+        "full (html.parser)": full.parse_trending_page,
+        "fast (embedded props)": fast.parse_trending_page,
+        "fast (restricted cards)": lambda page: fast._parse_cards(page, restricted=True),  # pylint: disable=protected-access
+    }
+
+    fixtures = load_fixtures()
+    if "synthetic.html" in fixtures:
+        print(
+            "警告: 保存済みのトレンドページが無いため合成ページで計測します。"
+            "fast の結果が実ページで正しいかは検証されません（--save-live で実ページを保存してください）"
+        )
+
+    mismatches = 0
+    for name, page in fixtures.items():
+        # fast が埋め込み props を使えたか（使えなければカード要素のパースにフォールバックする）
+        embedded = fast._parse_embedded_props(page) is not None  # pylint: disable=protected-access
+        print(f"\n# {name} ({len(page) / 1024:.0f} KB, 埋め込み props: {'あり' if embedded else 'なし'})")
+        print(f"{'mode':<26}{'median ms':>12}{'peak MB':>10}{'models':>8}")
+        baseline_ids = None
+        for mode, parse in modes.items():
+            result, elapsed, peak = measure(parse, page, args.repeat)
+            ids = [data["model_id"] for data in result]
+            if baseline_ids is None:
+                baseline_ids = ids
+            mark = ""
+            if ids != baseline_ids:
+                mismatches += 1
+                missing = [model_id for model_id in baseline_ids if model_id not in ids]
+                mark = f"  (full と不一致: 欠落 {len(missing)}件 {missing[:3]})"
+            print(f"{mode:<26}{elapsed * 1000:>12.1f}{peak / 1024 / 1024:>10.1f}{len(ids):>8}{mark}")
+        if not baseline_ids:
+            mismatches += 1
+            print("full でモデルを抽出できませんでした（ページ構造が変わった可能性があります）")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""HuggingFace / Notion / Anthropic の API を模したローカルスタブサーバー
+
+ベンチマーク用に、記録済みフィクスチャ（無ければ合成データ）を応答する。
+各サーバーは遅延とエラー率を設定でき、エンドポイント別のリクエスト数を数える。
+"""
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.bench_trending_parse import synthesize_trending_page
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, handler, latency: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        super().__init__(("127.0.0.1", 0), handler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.counts = Counter()
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.counts.clear()
+            self.bytes_sent = 0
+
+    def record(self, route: str, size: int) -> None:
+        with self._lock:
+            self.counts[route] += 1
+            self.bytes_sent += size
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            return self.random.random() < self.error_rate
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # ヘッダーと本文を別々に書き込むため、Nagle による遅延 ACK 待ちを避ける
+    disable_nagle_algorithm = True
+    server: StubServer
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def _read_body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send(self, route: str, status: int, body, content_type="application/json", headers=None):
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        self.server.record(route, len(payload))
+
+    def _dispatch(self, method: str):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        parsed = urlparse(self.path)
+        if self.server.should_fail():
+            self._read_body()
+            self._send(f"{method} error", 500, {"error": "stub failure"})
+            return
+        self.route(method, parsed.path, parse_qs(parsed.query))
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def route(self, method: str, path: str, query: dict):
+        raise NotImplementedError
+
+
+class HubFixtures:
+    """HF API の応答データ（fixtures_dir があれば記録済みのものを使う）
+
+    fixtures_dir には models.json（一覧）、commits/<author>__<name>.json、
+    trending.html を置く。
+    """
+
+    def __init__(self, n_models: int, fixtures_dir: Optional[Path] = None):
+        self.fixtures_dir = fixtures_dir
+        models_path = fixtures_dir / "models.json" if fixtures_dir else None
+        if models_path and models_path.exists():
+            recorded = json.loads(models_path.read_text(encoding="utf-8"))
+            # 記録件数が足りない場合は ID をずらして繰り返す
+            self.models = []
+            for i in range(n_models):
+                model = dict(recorded[i % len(recorded)])
+                if i >= len(recorded):
+                    model["id"] = f"{model['id']}-{i // len(recorded)}"
+                self.models.append(model)
+        else:
+            self.models = [self._synthetic_model(i) for i in range(n_models)]
+        self.by_id = {model["id"]: model for model in self.models}
+        trending_path = fixtures_dir / "trending.html" if fixtures_dir else None
+        self.trending_html = (
+            trending_path.read_text(encoding="utf-8")
+            if trending_path and trending_path.exists()
+            else synthesize_trending_page(n_models)
+        )
+
+    @staticmethod
+    def _synthetic_model(i: int) -> dict:
+        author = f"org{i % 7}"
+        return {
+            "id": f"{author}/model-{i}",
+            "author": author,
+            "downloads": 10_000_000 // (i + 1),
+            "likes": 5000 // (i + 1),
+            "tags": ["transformers", "pytorch", "text-generation", "license:mit", "region:us"],
+            "pipeline_tag": "text-generation",
+            "lastModified": "2024-05-01T12:00:00.000Z",
+            "private": False,
+            "trendingScore": 1000 - i,
+        }
+
+    def commits(self, model_id: str) -> list:
+        if self.fixtures_dir:
+            path = self.fixtures_dir / "commits" / f"{model_id.replace('/', '__')}.json"
+            if path.exists():
+                return json.loads(path.read_text(encoding="utf-8"))
+        return [
+            {
+                "id": uuid.uuid5(uuid.NAMESPACE_URL, f"{model_id}/{n}").hex,
+                "title": f"Update README.md ({n})",
+                "message": "",
+                "date": f"2024-04-{28 - n:02d}T10:00:00.000Z",
+            }
+            for n in range(20)
+        ]
+
+
+class HubHandler(StubHandler):
+    fixtures: HubFixtures
+
+    def route(self, method, path, query):
+        fixtures = self.server.fixtures
+        if path == "/models":
+            self._send("trending_html", 200, fixtures.trending_html.encode("utf-8"), "text/html")
+            return
+
+        match = re.fullmatch(r"/api/models/(.+)/commits(?:/[^/]+)?", path)
+        if match:
+            commits = fixtures.commits(match.group(1))
+            limit = int(query.get("limit", [len(commits)])[0])
+            etag = f'"{match.group(1)}-{len(commits)}"'
+            if self.headers.get("If-None-Match") == etag:
+                self._send("commits_304", 304, b"", headers={"ETag": etag})
+                return
+            self._send("commits", 200, commits[:limit], headers={"ETag": etag})
+            return
+
+        match = re.fullmatch(r"/api/models/(.+)", path)
+        if match:
+            model = fixtures.by_id.get(match.group(1))
+            if not model:
+                self._send("model_404", 404, {"error": "not found"})
+                return
+            etag = f'"{model["id"]}-{model["lastModified"]}"'
+            if self.headers.get("If-None-Match") == etag:
+                self._send("model_304", 304, b"", headers={"ETag": etag})
+                return
+            self._send("model", 200, model, headers={"ETag": etag})
+            return
+
+        if path == "/api/models":
+            sort = query.get("sort", ["downloads"])[0]
+            key = "trendingScore" if sort == "trendingScore" else "downloads"
+            ordered = sorted(fixtures.models, key=lambda m: m.get(key, 0), reverse=True)
+            limit = int(query.get("limit", ["1000"])[0])
+            cursor = int(query.get("cursor", ["0"])[0])
+            page = ordered[cursor : cursor + limit]
+            headers = {}
+            if cursor + limit < len(ordered):
+                headers["Link"] = (
+                    f'<{self.server.url}/api/models?sort={sort}&limit={limit}'
+                    f'&cursor={cursor + limit}>; rel="next"'
+                )
+            self._send(f"list_{sort}", 200, page, headers=headers)
+            return
+
+        self._send("unknown", 404, {"error": "unknown route"})
+
+
+class NotionHandler(StubHandler):
+    def route(self, method, path, query):
+        self._read_body()
+        if method == "POST" and path == "/v1/pages":
+            self._send("pages.create", 200, {"object": "page", "id": str(uuid.uuid4())})
+        elif method == "PATCH" and re.fullmatch(r"/v1/blocks/[^/]+/children", path):
+            self._send("blocks.children.append", 200, {"object": "list", "results": []})
+        elif method == "GET" and re.fullmatch(r"/v1/blocks/[^/]+/children", path):
+            results = [
+                {"object": "block", "id": str(uuid.uuid4()), "type": "heading_1"},
+                {"object": "block", "id": str(uuid.uuid4()), "type": "callout"},
+            ]
+            self._send("blocks.children.list", 200, {"object": "list", "results": results, "has_more": False})
+        elif method == "PATCH" and re.fullmatch(r"/v1/blocks/[^/]+", path):
+            self._send("blocks.update", 200, {"object": "block", "id": path.rsplit("/", 1)[-1]})
+        elif method == "PATCH" and re.fullmatch(r"/v1/pages/[^/]+", path):
+            self._send("pages.update", 200, {"object": "page", "id": path.rsplit("/", 1)[-1]})
+        elif method == "POST" and re.fullmatch(r"/v1/databases/[^/]+/query", path):
+            self._send("databases.query", 200, {"object": "list", "results": [], "has_more": False, "next_cursor": None})
+        else:
+            self._send("unknown", 404, {"object": "error", "status": 404, "code": "object_not_found", "message": path})
+
+
+class AnthropicHandler(StubHandler):
+    def route(self, method, path, query):
+        request = self._read_body()
+        if method == "POST" and path == "/v1/messages":
+            text = "本日のHugging Faceトレンドをお伝えします。" * 20
+            if request.get("stream"):
+                self._send("messages.stream", 200, self._sse(request, text), content_type="text/event-stream")
+                return
+            self._send(
+                "messages.create",
+                200,
+                {
+                    "id": f"msg_{uuid.uuid4().hex}",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": request.get("model", "stub"),
+                    "content": [{"type": "text", "text": text}],
+                    "stop_reason": "end_turn",
+                    "stop_sequence": None,
+                    "usage": {"input_tokens": 100, "output_tokens": 100},
+                },
+            )
+        else:
+            self._send("unknown", 404, {"type": "error", "error": {"type": "not_found_error", "message": path}})
+
+    @staticmethod
+    def _sse(request: dict, text: str) -> bytes:
+        """Messages API のストリーミング応答（server-sent events）を組み立てる"""
+        chunks = [text[i : i + 40] for i in range(0, len(text), 40)]
+        events = [
+            ("message_start", {
+                "type": "message_start",
+                "message": {
+                    "id": f"msg_{uuid.uuid4().hex}",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": request.get("model", "stub"),
+                    "content": [],
+                    "stop_reason": None,
+                    "stop_sequence": None,
+                    "usage": {"input_tokens": 100, "output_tokens": 1},
+                },
+            }),
+            ("content_block_start", {
+                "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""},
+            }),
+            *[
+                ("content_block_delta", {
+                    "type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": chunk},
+                })
+                for chunk in chunks
+            ],
+            ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+            ("message_delta", {
+                "type": "message_delta",
+                "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                "usage": {"output_tokens": 100},
+            }),
+            ("message_stop", {"type": "message_stop"}),
+        ]
+        return "".join(
+            f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n" for name, data in events
+        ).encode("utf-8")
+
+
+def start_stub_servers(
+    n_models: int,
+    fixtures_dir: Optional[Path] = None,
+    hub_latency: float = 0.0,
+    notion_latency: float = 0.0,
+    llm_latency: float = 0.0,
+    error_rate: float = 0.0,
+) -> dict:
+    """3つのスタブサーバーを起動して {"hub", "notion", "anthropic"} を返す"""
+    hub = StubServer(HubHandler, latency=hub_latency, error_rate=error_rate)
+    hub.fixtures = HubFixtures(n_models, fixtures_dir)
+    notion = StubServer(NotionHandler, latency=notion_latency, error_rate=error_rate, seed=1)
+    anthropic = StubServer(AnthropicHandler, latency=llm_latency, error_rate=error_rate, seed=2)
+    return {"hub": hub.start(), "notion": notion.start(), "anthropic": anthropic.start()}
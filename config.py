@@ -1,16 +1,85 @@
 import os
 from dataclasses import dataclass
+from pathlib import Path
 
 
 @dataclass
 class Config:
     NOTION_TOKEN: str = os.getenv("NOTION_TOKEN", "")
     NOTION_DATABASE_ID: str = os.getenv("NOTION_DATABASE_ID", "")
-    HF_BASE_URL: str = "https://huggingface.co"
-    HF_API_URL: str = "https://huggingface.co/api/models"
+    HF_BASE_URL: str = os.getenv("HF_BASE_URL", "https://huggingface.co")
+    HF_API_URL: str = f"{HF_BASE_URL}/api/models"
+    NOTION_BASE_URL: str = os.getenv("NOTION_BASE_URL", "https://api.notion.com")
     ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
-    UPDATE_TIME: str = "03:00"
-    MODEL_LIMIT: int = 10
+    ANTHROPIC_BASE_URL: str = os.getenv("ANTHROPIC_BASE_URL", "")  # 空なら SDK の既定値
+    NOTION_RATE_LIMIT: float = float(os.getenv("NOTION_RATE_LIMIT", "3"))  # req/s
+    # ホストごとの毎秒リクエスト数（0 は制限なし。429 を受けた場合は常に Retry-After に従う）
+    HF_RATE_LIMIT: float = float(os.getenv("HF_RATE_LIMIT", "0"))
+    ANTHROPIC_RATE_LIMIT: float = float(os.getenv("ANTHROPIC_RATE_LIMIT", "0"))
+    # ホストごとの同時実行数（成功で徐々に増やし、429 で半減させる）
+    RATE_LIMIT_INITIAL_CONCURRENCY: int = int(os.getenv("RATE_LIMIT_INITIAL_CONCURRENCY", "8"))
+    RATE_LIMIT_MAX_CONCURRENCY: int = int(os.getenv("RATE_LIMIT_MAX_CONCURRENCY", "32"))
+    RATE_LIMIT_RETRIES: int = int(os.getenv("RATE_LIMIT_RETRIES", "5"))  # 429 の再試行回数
+    NEWS_PROMPT_TOKEN_BUDGET: int = int(os.getenv("NEWS_PROMPT_TOKEN_BUDGET", "6000"))
+    # ページ作成後にニュース原稿を待つ秒数（0 は生成完了まで待つ）
+    NEWS_SCRIPT_DEADLINE: float = float(os.getenv("NEWS_SCRIPT_DEADLINE", "0"))
+    # ニュース原稿の生成方式（single / map_reduce / auto: モデル数が閾値を超えたら map_reduce）
+    NEWS_SCRIPT_MODE: str = os.getenv("NEWS_SCRIPT_MODE", "auto")
+    NEWS_SCRIPT_MAP_REDUCE_THRESHOLD: int = int(os.getenv("NEWS_SCRIPT_MAP_REDUCE_THRESHOLD", "40"))
+    # map-reduce 生成全体の持ち時間と、1回の Claude API 呼び出し（ストリーミング）の上限秒数
+    NEWS_SCRIPT_TIME_BUDGET: float = float(os.getenv("NEWS_SCRIPT_TIME_BUDGET", "90"))
+    NEWS_SCRIPT_CALL_TIMEOUT: float = float(os.getenv("NEWS_SCRIPT_CALL_TIMEOUT", "45"))
+    NEWS_SECTION_TOKEN_BUDGET: int = int(os.getenv("NEWS_SECTION_TOKEN_BUDGET", "2000"))
+    NEWS_SECTION_WORKERS: int = int(os.getenv("NEWS_SECTION_WORKERS", "4"))
+    UPDATE_TIME: str = os.getenv("UPDATE_TIME", "03:00")
+    # デーモンモードで実行間に保持するメモリキャッシュの件数上限
+    MEMORY_CACHE_SIZE: int = int(os.getenv("MEMORY_CACHE_SIZE", "2048"))
+    MODEL_LIMIT: int = int(os.getenv("MODEL_LIMIT", "10"))
+    TRENDING_SOURCE: str = os.getenv("TRENDING_SOURCE", "api")  # api / html
+    SCRAPER_PARSE_MODE: str = os.getenv("SCRAPER_PARSE_MODE", "fast")  # fast / full
+    FETCH_WORKERS: int = int(os.getenv("FETCH_WORKERS", "4"))
+    # コミット履歴の取得方法（incremental: 件数を指定して先頭ページのみ取得し、前回の最新コミットで打ち切る / full）
+    COMMIT_FETCH_MODE: str = os.getenv("COMMIT_FETCH_MODE", "incremental")
+    HTTP_POOL_SIZE: int = int(os.getenv("HTTP_POOL_SIZE", "0"))  # 0 は FETCH_WORKERS に合わせる
+    HTTP_RETRIES: int = int(os.getenv("HTTP_RETRIES", "3"))
+    HTTP_BACKOFF_FACTOR: float = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+    DATA_DIR: str = os.getenv(
+        "DATA_DIR", str(Path.home() / ".cache" / "handson-catchup-huggingface")
+    )
+    HTTP_CACHE_DIR: str = os.getenv("HTTP_CACHE_DIR", str(Path(DATA_DIR) / "http"))
+    HTTP_CACHE_MAX_BYTES: int = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+    HTTP_CACHE_MAX_AGE: float = float(os.getenv("HTTP_CACHE_MAX_AGE", str(30 * 24 * 3600)))
+    SNAPSHOT_DB: str = os.getenv("SNAPSHOT_DB", str(Path(DATA_DIR) / "snapshots.sqlite3"))
+    TREND_WINDOW_DAYS: int = int(os.getenv("TREND_WINDOW_DAYS", "30"))
+    TREND_GROWTH_THRESHOLD: float = float(os.getenv("TREND_GROWTH_THRESHOLD", "0.2"))
+    TREND_RANK_CHANGE_THRESHOLD: int = int(os.getenv("TREND_RANK_CHANGE_THRESHOLD", "5"))
+    NEWS_SCRIPT_CACHE_DIR: str = os.getenv(
+        "NEWS_SCRIPT_CACHE_DIR", str(Path(DATA_DIR) / "news_scripts")
+    )
+    # 実行ごとのモデル統計を追記する列指向バイナリの出力先（空にすると出力しない）
+    COLUMNAR_DIR: str = os.getenv("COLUMNAR_DIR", str(Path(DATA_DIR) / "columnar"))
+    REPORT_DIR: str = os.getenv("REPORT_DIR", str(Path(DATA_DIR) / "reports"))
+    METRICS_TEXTFILE: str = os.getenv(
+        "METRICS_TEXTFILE", str(Path(REPORT_DIR) / "hf_tracker.prom")
+    )
+    CRAWL_PAGE_SIZE: int = int(os.getenv("CRAWL_PAGE_SIZE", "1000"))
+    # シャード分割取り込み（0 は CPU コア数）とシャードキー（hash / author）
+    INGEST_PROCESSES: int = int(os.getenv("INGEST_PROCESSES", "0"))
+    INGEST_SHARD_BY: str = os.getenv("INGEST_SHARD_BY", "hash")
+    CRAWL_CHECKPOINT: str = os.getenv(
+        "CRAWL_CHECKPOINT", str(Path(DATA_DIR) / "crawl_checkpoint.json")
+    )
+    # --ingest は --crawl と別のチェックポイントで再開する
+    INGEST_CHECKPOINT: str = os.getenv(
+        "INGEST_CHECKPOINT", str(Path(DATA_DIR) / "ingest_checkpoint.json")
+    )
+    # Notion への出力方法（page: 日次レポートページ / sync: モデル別データベースの差分同期 / both）
+    NOTION_MODE: str = os.getenv("NOTION_MODE", "page")
+    NOTION_SYNC_DATABASE_ID: str = os.getenv("NOTION_SYNC_DATABASE_ID", "")
+    NOTION_SYNC_STATE: str = os.getenv(
+        "NOTION_SYNC_STATE", str(Path(DATA_DIR) / "notion_sync.json")
+    )
+    NOTION_SYNC_WORKERS: int = int(os.getenv("NOTION_SYNC_WORKERS", "3"))
 
     @classmethod
     def validate(cls):
@@ -18,3 +87,7 @@ class Config:
             raise ValueError(
                 "NOTION_TOKEN と NOTION_DATABASE_ID の環境変数を設定してください"
             )
+        if cls.NOTION_MODE in ("sync", "both") and not cls.NOTION_SYNC_DATABASE_ID:
+            raise ValueError(
+                "NOTION_MODE が sync / both の場合は NOTION_SYNC_DATABASE_ID を設定してください"
+            )
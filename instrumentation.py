@@ -0,0 +1,145 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class Instrumentation:
+    """ステージごとの所要時間とサービスごとのカウンタを集計する"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started_at = time.time()
+            self.spans: Dict[str, dict] = defaultdict(
+                lambda: {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            )
+            self.counters: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    @contextmanager
+    def span(self, name: str):
+        """with ブロックの所要時間を name のステージとして記録"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                span = self.spans[name]
+                span["count"] += 1
+                span["total_seconds"] += elapsed
+                span["max_seconds"] = max(span["max_seconds"], elapsed)
+
+    def timed(self, name: str):
+        """関数の所要時間を記録するデコレーター"""
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def incr(self, service: str, metric: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[service][metric] += value
+
+    def merge(self, report: dict) -> None:
+        """別プロセスで集計したレポートのステージとカウンタを加算"""
+        with self._lock:
+            for name, other in report.get("stages", {}).items():
+                span = self.spans[name]
+                span["count"] += other["count"]
+                span["total_seconds"] += other["total_seconds"]
+                span["max_seconds"] = max(span["max_seconds"], other["max_seconds"])
+            for service, values in report.get("counters", {}).items():
+                for metric, value in values.items():
+                    self.counters[service][metric] += value
+
+    def report(self, **extra) -> dict:
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "finished_at": time.time(),
+                "stages": {name: dict(span) for name, span in self.spans.items()},
+                "counters": {
+                    service: dict(metrics) for service, metrics in self.counters.items()
+                },
+                **extra,
+            }
+
+    def write_json(self, path: Path, report: dict) -> None:
+        _write_atomic(path, json.dumps(report, ensure_ascii=False, indent=2))
+
+    def write_prometheus(self, path: Path, report: dict, prefix: str = "hf_tracker") -> None:
+        """node_exporter の textfile collector 形式で出力"""
+        lines = [
+            f"# HELP {prefix}_stage_seconds Total time spent in each stage during the last run.",
+            f"# TYPE {prefix}_stage_seconds gauge",
+        ]
+        for name, span in sorted(report["stages"].items()):
+            lines.append(f'{prefix}_stage_seconds{{stage="{name}"}} {span["total_seconds"]:.6f}')
+        lines += [
+            f"# HELP {prefix}_stage_calls Number of times each stage ran during the last run.",
+            f"# TYPE {prefix}_stage_calls gauge",
+        ]
+        for name, span in sorted(report["stages"].items()):
+            lines.append(f'{prefix}_stage_calls{{stage="{name}"}} {span["count"]}')
+
+        metrics = sorted({metric for values in report["counters"].values() for metric in values})
+        for metric in metrics:
+            lines += [
+                f"# HELP {prefix}_{metric} Per-service {metric.replace('_', ' ')} during the last run.",
+                f"# TYPE {prefix}_{metric} gauge",
+            ]
+            for service, values in sorted(report["counters"].items()):
+                if metric in values:
+                    lines.append(f'{prefix}_{metric}{{service="{service}"}} {values[metric]:g}')
+
+        lines += [
+            f"# HELP {prefix}_last_run_success Whether the last run finished without error.",
+            f"# TYPE {prefix}_last_run_success gauge",
+            f"{prefix}_last_run_success {int(report.get('status') == 'success')}",
+            f"# HELP {prefix}_last_run_timestamp_seconds Unix time the last run finished.",
+            f"# TYPE {prefix}_last_run_timestamp_seconds gauge",
+            f"{prefix}_last_run_timestamp_seconds {report['finished_at']:.0f}",
+        ]
+        _write_atomic(path, "\n".join(lines) + "\n")
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+# プロセス全体で共有する計測器
+metrics = Instrumentation()
+
+
+def record_http(service: str, response, from_cache: Optional[bool] = None) -> None:
+    """HTTP レスポンス1件分のカウンタを更新"""
+    metrics.incr(service, "http_requests")
+    metrics.incr(service, "http_bytes", len(response.content or b""))
+    if response.status_code >= 400:
+        metrics.incr(service, "http_errors")
+
+    retries = getattr(getattr(response, "raw", None), "retries", None)
+    if retries is not None and getattr(retries, "history", None):
+        metrics.incr(service, "http_retries", len(retries.history))
+
+    if from_cache is not None:
+        metrics.incr(service, "cache_hits" if from_cache else "cache_misses")
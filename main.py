@@ -1,12 +1,22 @@
 import argparse
+import cProfile
 import logging
+import signal
+import threading
+import time
+from functools import cached_property
 from pathlib import Path
 
+from typing import TYPE_CHECKING, List, Optional
+
 from config import Config
+from instrumentation import metrics
 from models.huggingface import HuggingFaceModel
-from services.huggingface import HuggingFaceService
-from services.notion import NotionService
-from services.scraper import HuggingFaceScraper
+from services.concurrency import ordered_map
+
+# requests / numpy / bs4 / 各 SDK を読み込むサービスは、--check の起動を速くするため使用時に import する
+if TYPE_CHECKING:
+    from services.ingest import ShardedIngestor
 
 # ロギングの設定
 log_dir = Path.home() / "Library" / "Logs" / "handson-catchup-huggingface"
@@ -23,58 +33,453 @@ logger = logging.getLogger(__name__)
 
 
 class ModelTracker:
-    def __init__(self):
-        self.hf_service = HuggingFaceService()
-        self.notion_service = NotionService()
-        self.scraper = HuggingFaceScraper()
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        use_cache: bool = True,
+        trending_source: Optional[str] = None,
+        use_snapshots: bool = True,
+        script_deadline: Optional[float] = None,
+        notion_mode: Optional[str] = None,
+        record_path: Optional[str] = None,
+        replay_path: Optional[str] = None,
+    ):
+        from services.archive import RunArchive
+        from services.http import HttpClient
+        from services.http_cache import HttpCache
+        from services.huggingface import HuggingFaceService
+        from services.news_prompt import ScriptCache
+        from services.notion import NotionService
+        from services.snapshot import SnapshotStore
+
+        self.workers = workers or Config.FETCH_WORKERS
+        self.trending_source = trending_source or Config.TRENDING_SOURCE
+        self.script_deadline = script_deadline
+        self.notion_mode = notion_mode or Config.NOTION_MODE
+        # HF API・スクレイパー・Claude API の通信を記録、または記録から再生する
+        self.archive = None
+        if record_path:
+            self.archive = RunArchive(record_path, "record")
+        elif replay_path:
+            self.archive = RunArchive(replay_path, "replay")
+        # アーカイブだけで再生できるよう、記録・再生中はローカルの再利用を行わない
+        reuse_local = self.archive is None
+        # HF API とスクレイパーで接続プールを共有する
+        self.http = HttpClient(
+            pool_size=max(self.workers, Config.HTTP_POOL_SIZE),
+            cache=HttpCache() if use_cache and reuse_local else None,
+            archive=self.archive,
+        )
+        # 前回のスナップショットと比較し、更新されたモデルのみコミットを再取得する
+        self.snapshot_store = SnapshotStore() if use_snapshots else None
+        self.hf_service = HuggingFaceService(
+            max_workers=self.workers,
+            http=self.http,
+            snapshot_store=self.snapshot_store if reuse_local else None,
+        )
+        self.notion_service = NotionService(
+            script_cache=ScriptCache() if use_cache and reuse_local else None,
+            archive=self.archive,
+        )
+
+    @cached_property
+    def scraper(self):
+        """HTML フォールバック時のみ使用するため、初回利用時に生成"""
+        from services.scraper import HuggingFaceScraper
+
+        return HuggingFaceScraper(http=self.http)
+
+    def _build_trending_model(self, data: dict) -> Optional[HuggingFaceModel]:
+        """スクレイピング結果1件からモデル情報を構築"""
+        model_details = self.hf_service.get_model_details(data["model_id"])
+        if not model_details:
+            return None
+        model = HuggingFaceModel.from_api_response(model_details, data)
+        return self.hf_service.enrich_model_data(model)
+
+    def get_trending_models(self) -> List[HuggingFaceModel]:
+        """トレンドモデルを取得（API で取得できない場合は HTML スクレイピングにフォールバック）"""
+        if self.trending_source == "api":
+            try:
+                models = self.hf_service.get_trending_models(Config.MODEL_LIMIT)
+                if models:
+                    return models
+                logger.warning("Hub API からトレンドモデルを取得できませんでした")
+            except Exception as e:
+                logger.warning("Hub API でのトレンド取得に失敗しました: %s", str(e))
+            logger.info("HTMLスクレイピングでトレンドモデルを取得します")
+
+        trend_data = self.scraper.get_trending_models_data()
+        return [
+            model
+            for model in ordered_map(self._build_trending_model, trend_data, self.workers)
+            if model
+        ]
+
+    def crawl_catalog(self, max_models: Optional[int] = None) -> int:
+        """モデルカタログ全体を巡回"""
+        from services.crawler import ModelCatalogCrawler
+
+        crawler = ModelCatalogCrawler(http=self.http)
+        count = 0
+        for page in crawler.crawl_pages(max_models=max_models):
+            # ページを保存してからチェックポイントを進める（中断時に未保存のモデルを失わない）
+            self._save_snapshots(page, with_commits=False)
+            crawler.commit_checkpoint()
+            previous, count = count, count + len(page)
+            if count // 10000 > previous // 10000:
+                logger.info("%d件のモデルを巡回しました", count)
+        logger.info("カタログ巡回完了: %d件", count)
+        return count
+
+    def ingest_catalog(
+        self,
+        max_models: Optional[int] = None,
+        processes: Optional[int] = None,
+        shard_by: Optional[str] = None,
+    ) -> int:
+        """カタログを巡回し、詳細とコミット履歴の取得・解析をプロセスプールで分散実行"""
+        from services.crawler import ModelCatalogCrawler
+        from services.ingest import ShardedIngestor
+
+        metrics.reset()
+        crawler = ModelCatalogCrawler(
+            http=self.http, checkpoint_path=Config.INGEST_CHECKPOINT
+        )
+        count = 0
+        status = "error"
+        try:
+            with ShardedIngestor(
+                processes=processes, threads=self.workers, shard_by=shard_by,
+                use_cache=self.http.cache is not None,
+            ) as ingestor, metrics.span("run"):
+                logger.info("%dプロセスで取り込みを開始します", ingestor.processes)
+                for page in crawler.crawl_pages(max_models=max_models):
+                    count += self._ingest_batch(ingestor, [model.id for model in page])
+                    crawler.commit_checkpoint()
+            status = "success"
+        finally:
+            self._write_run_report(status, mode="ingest", models=count)
+        logger.info("取り込み完了: %d件", count)
+        return count
+
+    def _ingest_batch(self, ingestor: "ShardedIngestor", model_ids: List[str]) -> int:
+        if not model_ids:
+            return 0
+        with metrics.span("ingest"):
+            models = ingestor.ingest(model_ids)
+        self._save_snapshots(models)
+        return len(models)
+
+    @metrics.timed("snapshot")
+    def _save_snapshots(self, models: List[HuggingFaceModel], with_commits: bool = True):
+        if self.snapshot_store and models:
+            self.snapshot_store.save_models(models, with_commits=with_commits)
+
+    @metrics.timed("columnar_export")
+    def _export_columnar(self, models: List[HuggingFaceModel]):
+        """分析用に当日の統計を列指向ファイルへ追記（失敗しても更新処理は続ける）"""
+        if not Config.COLUMNAR_DIR or not models:
+            return
+        from services.columnar import ColumnarSnapshotWriter
+
+        try:
+            ColumnarSnapshotWriter().append(models)
+        except (OSError, ValueError) as e:
+            logger.warning("列指向ファイルへの出力に失敗しました: %s", str(e))
+
+    @metrics.timed("analytics")
+    def _annotate_growth(self, models: List[HuggingFaceModel]):
+        if not self.snapshot_store:
+            return
+        from services.trends import TrendAnalytics
+
+        analytics = TrendAnalytics.from_snapshot_store(self.snapshot_store)
+        if analytics:
+            analytics.annotate(models)
+        return analytics
+
+    @metrics.timed("aggregation")
+    def _aggregate(self, models: List[HuggingFaceModel], analytics) -> dict:
+        """分野・作者・タグ別の集計表を作成（ニュース原稿のプロンプト用）"""
+        from services.aggregates import ModelAggregates
+
+        growth = {}
+        if analytics:
+            for model in models:
+                model_metrics = analytics.metrics_for(model.id)
+                if model_metrics:
+                    growth[model.id] = model_metrics["downloads_7d"]
+        return ModelAggregates(models, growth).prompt_tables()
+
+    def _write_run_report(self, status: str, **extra):
+        """計測結果を JSON レポートと Prometheus の textfile として出力"""
+        report = metrics.report(status=status, workers=self.workers, **extra)
+        report_dir = Path(Config.REPORT_DIR)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(report["started_at"]))
+        try:
+            metrics.write_json(report_dir / f"run-{stamp}.json", report)
+            metrics.write_prometheus(Path(Config.METRICS_TEXTFILE), report)
+        except OSError as e:
+            logger.warning("実行レポートの書き込みに失敗しました: %s", str(e))
+            return
+        logger.info("実行レポートを出力しました: %s", report_dir / f"run-{stamp}.json")
 
     def run_update(self):
         """トレンド情報の更新を実行"""
+        metrics.reset()
+        self.hf_service.reset_memo()
+        status = "error"
+        try:
+            with metrics.span("run"):
+                status = self._run_update()
+        finally:
+            self._record_memo_stats()
+            self._write_run_report(status)
+            if self.archive and self.archive.recording:
+                self.archive.close()
+                logger.info("通信内容を記録しました: %s", self.archive.path)
+
+    def _record_memo_stats(self):
+        for name, stats in self.hf_service.memo_stats().items():
+            for key, value in stats.items():
+                metrics.incr("huggingface", f"memo_{name}_{key}", value)
+
+    def _run_update(self) -> str:
         try:
             logger.info("=== 日次アップデート開始 ===")
 
             # トレンドモデルの取得
-            trend_data = self.scraper.get_trending_models_data()
-            trending_models = []
-
-            for data in trend_data:
-                model_details = self.hf_service.get_model_details(data["model_id"])
-                if model_details:
-                    model = HuggingFaceModel.from_api_response(model_details, data)
-                    model = self.hf_service.enrich_model_data(model)
-                    trending_models.append(model)
+            trending_models = self.get_trending_models()
 
             # 人気モデルの取得
-            popular_models = self.hf_service.get_popular_models()
+            popular_models = self.hf_service.get_popular_models(Config.MODEL_LIMIT)
+
+            # 取得結果をスナップショットとして保存し、過去分と合わせて成長指標を算出
+            # （再生した統計は記録日のものなので、当日の履歴には書き込まない）
+            analytics = None
+            if self.archive and self.archive.replaying:
+                logger.info("再生中のため、スナップショットの保存と成長指標の算出を省略します")
+            else:
+                self._save_snapshots(trending_models + popular_models)
+                self._export_columnar(trending_models + popular_models)
+                analytics = self._annotate_growth(trending_models + popular_models)
+            aggregates = self._aggregate(trending_models + popular_models, analytics)
 
             if trending_models and popular_models:
-                self.notion_service.create_page(popular_models, trending_models)
+                if self.notion_mode in ("page", "both"):
+                    self.notion_service.create_page(
+                        popular_models,
+                        trending_models,
+                        script_deadline=self.script_deadline,
+                        aggregates=aggregates,
+                    )
+                if self.notion_mode in ("sync", "both"):
+                    self.notion_service.sync_models(popular_models, trending_models)
                 logger.info("アップデート完了")
+                status = "success"
             else:
                 logger.error("モデルの取得に失敗しました")
+                status = "no_models"
 
             logger.info("=== 日次アップデート終了 ===")
+            return status
 
         except Exception as e:
             logger.error("エラーが発生しました: %s", str(e), exc_info=True)
             raise
 
+    def run_scheduled_update(self):
+        """デーモンから呼び出す更新処理（失敗してもスケジューラを止めない）"""
+        try:
+            self.run_update()
+        except Exception as e:
+            logger.error("定期アップデートに失敗しました: %s", str(e))
+
+    def close(self):
+        """保持している接続を解放"""
+        if self.archive:
+            self.archive.close()
+        self.http.close()
+        if self.snapshot_store:
+            self.snapshot_store.close()
+
+
+def run_daemon(tracker: ModelTracker, run_now: bool = False):
+    """UPDATE_TIME に毎日更新する常駐モード（run_now=True なら起動時にも一度更新）"""
+    import schedule
+
+    stop_event = threading.Event()
+
+    def _request_stop(signum, _frame):
+        logger.info("シグナル %s を受信しました。実行中の処理の完了後に停止します", signum)
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, _request_stop)
+    signal.signal(signal.SIGTERM, _request_stop)
+
+    schedule.every().day.at(Config.UPDATE_TIME).do(tracker.run_scheduled_update)
+    logger.info("デーモンを開始しました（毎日 %s に更新）", Config.UPDATE_TIME)
+    try:
+        # 再起動のたびに日次レポートが重複して公開されないよう、起動時の更新は明示した場合のみ
+        if run_now:
+            tracker.run_scheduled_update()
+        while not stop_event.is_set():
+            schedule.run_pending()
+            idle = schedule.idle_seconds()
+            stop_event.wait(timeout=min(max(idle or 0, 1), 60))
+    finally:
+        schedule.clear()
+        tracker.close()
+        logger.info("デーモンを停止しました")
+
 
 def main():
     parser = argparse.ArgumentParser(description="AI Model Trend Tracker")
     parser.add_argument("--check", action="store_true", help="設定の検証のみを実行")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=f"モデル情報取得の並列数（既定: {Config.FETCH_WORKERS}、1で逐次実行）",
+    )
+    parser.add_argument(
+        "--trending-source",
+        choices=["api", "html"],
+        default=None,
+        help=f"トレンドモデルの取得元（既定: {Config.TRENDING_SOURCE}）",
+    )
+    parser.add_argument(
+        "--crawl",
+        action="store_true",
+        help="モデルカタログ全体を巡回（中断時は次回チェックポイントから再開）",
+    )
+    parser.add_argument(
+        "--crawl-limit", type=int, default=None, help="巡回するモデル数の上限"
+    )
+    parser.add_argument(
+        "--ingest",
+        action="store_true",
+        help="カタログを巡回し、詳細とコミット履歴をプロセスプールで分散取得してスナップショットに保存",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="--ingest のプロセス数（既定: INGEST_PROCESSES、0 は CPU コア数）",
+    )
+    parser.add_argument(
+        "--shard-by",
+        choices=["hash", "author"],
+        default=None,
+        help=f"--ingest のシャードキー（既定: {Config.INGEST_SHARD_BY}）",
+    )
+    parser.add_argument(
+        "--script-deadline",
+        type=float,
+        default=None,
+        help="ページ作成後にニュース原稿を待つ秒数（超過時は原稿なしで公開）",
+    )
+    parser.add_argument(
+        "--notion-mode",
+        choices=["page", "sync", "both"],
+        default=None,
+        help=f"Notion への出力方法（既定: {Config.NOTION_MODE}）。sync は変更のあったモデルの行だけを更新",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help=f"常駐して毎日 {Config.UPDATE_TIME} に更新（接続とキャッシュを実行間で再利用）",
+    )
+    parser.add_argument(
+        "--run-now",
+        action="store_true",
+        help="--daemon の起動時にも一度更新する（既定では UPDATE_TIME まで待機）",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="PATH",
+        default=None,
+        help="HF API・スクレイピング・Claude API の通信内容を圧縮アーカイブに記録",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="PATH",
+        default=None,
+        help="--record で記録したアーカイブから通信内容を再生（Notion への出力のみ実行）",
+    )
+    parser.add_argument(
+        "--no-snapshot",
+        action="store_true",
+        help="ローカルのスナップショットストアを使用しない",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="HTTPレスポンスと生成済みニュース原稿のディスクキャッシュを使用しない",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="PATH",
+        help="cProfile の結果を出力（PATH 省略時は REPORT_DIR に保存）",
+    )
     args = parser.parse_args()
+    if args.record and args.replay:
+        parser.error("--record と --replay は同時に指定できません")
+    if (args.record or args.replay) and (args.daemon or args.crawl or args.ingest):
+        parser.error("--record / --replay は単発のアップデートでのみ使用できます")
+    if args.run_now and not args.daemon:
+        parser.error("--run-now は --daemon と組み合わせて使用します")
 
     try:
         # 設定の検証
+        if args.notion_mode:
+            Config.NOTION_MODE = args.notion_mode
         Config.validate()
         if args.check:
             logger.info("設定の検証が完了しました")
             return
 
         # 更新の実行
-        tracker = ModelTracker()
-        tracker.run_update()
+        tracker = ModelTracker(
+            workers=args.workers,
+            use_cache=not args.no_cache,
+            trending_source=args.trending_source,
+            use_snapshots=not args.no_snapshot,
+            script_deadline=args.script_deadline,
+            notion_mode=args.notion_mode,
+            record_path=args.record,
+            replay_path=args.replay,
+        )
+        profiler = cProfile.Profile() if args.profile is not None else None
+        if profiler:
+            profiler.enable()
+        try:
+            if args.crawl:
+                tracker.crawl_catalog(max_models=args.crawl_limit)
+            elif args.ingest:
+                tracker.ingest_catalog(
+                    max_models=args.crawl_limit,
+                    processes=args.processes,
+                    shard_by=args.shard_by,
+                )
+            elif args.daemon:
+                run_daemon(tracker, run_now=args.run_now)
+            else:
+                tracker.run_update()
+        finally:
+            if profiler:
+                profiler.disable()
+                profile_path = Path(
+                    args.profile
+                    or Path(Config.REPORT_DIR) / f"profile-{time.strftime('%Y%m%d-%H%M%S')}.prof"
+                )
+                profile_path.parent.mkdir(parents=True, exist_ok=True)
+                profiler.dump_stats(str(profile_path))
+                logger.info("プロファイル結果を出力しました: %s", profile_path)
 
     except Exception as e:
         logger.error("致命的なエラーが発生しました: %s", str(e), exc_info=True)
@@ -4,10 +4,12 @@ from .huggingface import (
     ModelStats,
     TrendReason
 )
+from .table import ModelTable
 
 __all__ = [
     'HuggingFaceModel',
     'ModelCommit',
     'ModelStats',
+    'ModelTable',
     'TrendReason'
 ]
\ No newline at end of file
@@ -1,36 +1,87 @@
+import sys
 from dataclasses import dataclass
-from typing import List, Union, Optional
+from typing import List, Optional, Sequence, Tuple, Union
 from datetime import datetime
 
-@dataclass
+# Python 3.10 以降はインスタンスごとの __dict__ を持たない slots 付きで定義する
+_slotted = dataclass(slots=True) if sys.version_info >= (3, 10) else dataclass
+
+
+def intern_tags(tags: Sequence[str]) -> Tuple[str, ...]:
+    """タグをインターンしたタプルに変換（同じタグ文字列をモデル間で共有する）"""
+    return tuple(sys.intern(tag) for tag in tags)
+
+
 class ModelCommit:
-    title: str
-    date: datetime
-    description: Optional[str] = None
+    """コミット情報（日付は API の文字列のまま保持し、初回参照時に datetime に変換する）"""
+
+    __slots__ = ("title", "_date", "description")
+
+    def __init__(
+        self,
+        title: str,
+        date: Union[str, datetime],
+        description: Optional[str] = None,
+    ):
+        self.title = title
+        self._date = date
+        self.description = description
+
+    @property
+    def date(self) -> datetime:
+        if isinstance(self._date, str):
+            self._date = datetime.fromisoformat(self._date.replace("Z", "+00:00"))
+        return self._date
+
+    @date.setter
+    def date(self, value: Union[str, datetime]):
+        self._date = value
 
-@dataclass
+    def __eq__(self, other):
+        if not isinstance(other, ModelCommit):
+            return NotImplemented
+        return (self.title, self.date, self.description) == (
+            other.title,
+            other.date,
+            other.description,
+        )
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (
+            f"ModelCommit(title={self.title!r}, date={self.date!r}, "
+            f"description={self.description!r})"
+        )
+
+@_slotted
 class ModelStats:
     downloads: int
     likes: int
     recent_downloads: Optional[str] = None
 
-@dataclass
+@_slotted
 class TrendReason:
     type: str
     description: str
 
-@dataclass
+@_slotted
 class HuggingFaceModel:
     id: str
     author: str
     description: Optional[str]
-    tags: List[str]
+    tags: Tuple[str, ...]
     last_modified: Union[str, datetime]  
     stats: ModelStats
     recent_commits: List[ModelCommit]
     trend_reasons: List[TrendReason]
     private: bool = False
 
+    def __post_init__(self):
+        self.tags = intern_tags(self.tags)
+        if isinstance(self.author, str):
+            self.author = sys.intern(self.author)
+
     @classmethod
     def from_api_response(cls, data: dict, trend_data: dict = None):
         stats = ModelStats(
@@ -49,4 +100,4 @@ class HuggingFaceModel:
             recent_commits=[],  # 後で更新
             trend_reasons=[],   # 後で更新
             private=data.get('private', False)
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,130 @@
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .huggingface import HuggingFaceModel, ModelStats
+
+
+class ModelTable:
+    """大量のモデル統計を列ごとの配列で保持するコンテナ
+
+    ダウンロード数・いいね数は array('q')、タグは語彙 ID の CSR 形式
+    （tag_offsets / tag_ids）で保持し、モデルごとのオブジェクトを作らない。
+    """
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.authors: List[str] = []
+        self.last_modified: List[str] = []
+        self.downloads = array("q")
+        self.likes = array("q")
+        self.private = array("b")
+        self.tag_vocab: List[str] = []
+        self.tag_offsets = array("I", [0])
+        self.tag_ids = array("I")
+        self._tag_index: Dict[str, int] = {}
+        self._row_index: Dict[str, int] = {}
+
+    @classmethod
+    def from_models(cls, models: Iterable[HuggingFaceModel]) -> "ModelTable":
+        table = cls()
+        table.extend(models)
+        return table
+
+    @classmethod
+    def from_api_responses(cls, items: Iterable[dict]) -> "ModelTable":
+        """API レスポンスから中間オブジェクトを作らずに構築"""
+        table = cls()
+        for data in items:
+            table.append_row(
+                model_id=data.get("id", ""),
+                author=data.get("author", "Unknown"),
+                downloads=data.get("downloads", 0),
+                likes=data.get("likes", 0),
+                tags=data.get("tags", []),
+                last_modified=data.get("lastModified", ""),
+                private=data.get("private", False),
+            )
+        return table
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[HuggingFaceModel]:
+        for i in range(len(self)):
+            yield self.model_at(i)
+
+    def append(self, model: HuggingFaceModel) -> None:
+        last_modified = model.last_modified
+        self.append_row(
+            model_id=model.id,
+            author=model.author,
+            downloads=model.stats.downloads,
+            likes=model.stats.likes,
+            tags=model.tags,
+            last_modified=(
+                last_modified if isinstance(last_modified, str) else last_modified.isoformat()
+            ),
+            private=model.private,
+        )
+
+    def extend(self, models: Iterable[HuggingFaceModel]) -> None:
+        for model in models:
+            self.append(model)
+
+    def append_row(
+        self,
+        model_id: str,
+        author: str,
+        downloads: int,
+        likes: int,
+        tags: Iterable[str],
+        last_modified: str,
+        private: bool = False,
+    ) -> None:
+        self._row_index[model_id] = len(self.ids)
+        self.ids.append(model_id)
+        self.authors.append(sys.intern(author or "Unknown"))
+        self.last_modified.append(last_modified or "")
+        self.downloads.append(downloads or 0)
+        self.likes.append(likes or 0)
+        self.private.append(1 if private else 0)
+        for tag in tags:
+            self.tag_ids.append(self._tag_id(tag))
+        self.tag_offsets.append(len(self.tag_ids))
+
+    def _tag_id(self, tag: str) -> int:
+        tag_id = self._tag_index.get(tag)
+        if tag_id is None:
+            tag_id = self._tag_index[tag] = len(self.tag_vocab)
+            self.tag_vocab.append(sys.intern(tag))
+        return tag_id
+
+    def index_of(self, model_id: str) -> Optional[int]:
+        return self._row_index.get(model_id)
+
+    def tags_at(self, i: int) -> Tuple[str, ...]:
+        start, end = self.tag_offsets[i], self.tag_offsets[i + 1]
+        return tuple(self.tag_vocab[tag_id] for tag_id in self.tag_ids[start:end])
+
+    def model_at(self, i: int) -> HuggingFaceModel:
+        """i 行目を HuggingFaceModel として取り出す"""
+        return HuggingFaceModel(
+            id=self.ids[i],
+            author=self.authors[i],
+            description=None,
+            tags=self.tags_at(i),
+            last_modified=self.last_modified[i],
+            stats=ModelStats(downloads=self.downloads[i], likes=self.likes[i]),
+            recent_commits=[],
+            trend_reasons=[],
+            private=bool(self.private[i]),
+        )
+
+    def top(self, n: int, by: str = "downloads") -> List[int]:
+        """指定列の上位 n 件の行番号"""
+        column = getattr(self, by)
+        return sorted(range(len(column)), key=column.__getitem__, reverse=True)[:n]
+
+    def total(self, by: str = "downloads") -> int:
+        return sum(getattr(self, by))
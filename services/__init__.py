@@ -1,9 +1,26 @@
-from .huggingface import HuggingFaceService
-from .notion import NotionService
-from .scraper import HuggingFaceScraper
+from importlib import import_module
+
+# 各サービスは重い SDK に依存するため、属性アクセス時に初めて import する（PEP 562）
+_LAZY_ATTRIBUTES = {
+    'HuggingFaceService': '.huggingface',
+    'NotionService': '.notion',
+    'HuggingFaceScraper': '.scraper',
+}
 
 __all__ = [
     'HuggingFaceService',
     'NotionService',
     'HuggingFaceScraper'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,136 @@
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from models.huggingface import HuggingFaceModel
+from services.news_prompt import NOISE_TAG_PREFIXES, NOISE_TAGS
+
+# パイプラインタグから分野への対応
+DOMAIN_BY_PIPELINE = {
+    "text-generation": "text",
+    "text2text-generation": "text",
+    "text-classification": "text",
+    "token-classification": "text",
+    "question-answering": "text",
+    "summarization": "text",
+    "translation": "text",
+    "fill-mask": "text",
+    "sentence-similarity": "text",
+    "feature-extraction": "text",
+    "zero-shot-classification": "text",
+    "text-to-image": "image",
+    "image-to-image": "image",
+    "image-classification": "image",
+    "image-segmentation": "image",
+    "object-detection": "image",
+    "depth-estimation": "image",
+    "unconditional-image-generation": "image",
+    "zero-shot-image-classification": "image",
+    "mask-generation": "image",
+    "automatic-speech-recognition": "audio",
+    "text-to-speech": "audio",
+    "text-to-audio": "audio",
+    "audio-classification": "audio",
+    "audio-to-audio": "audio",
+    "voice-activity-detection": "audio",
+    "text-to-video": "video",
+    "image-to-video": "video",
+    "video-classification": "video",
+    "text-to-3d": "3d",
+    "image-to-3d": "3d",
+    "image-text-to-text": "multimodal",
+    "image-to-text": "multimodal",
+    "visual-question-answering": "multimodal",
+    "document-question-answering": "multimodal",
+    "any-to-any": "multimodal",
+    "reinforcement-learning": "rl",
+    "robotics": "rl",
+    "tabular-classification": "tabular",
+    "tabular-regression": "tabular",
+    "time-series-forecasting": "tabular",
+}
+
+# プロンプトに渡す集計表の列
+TABLE_COLUMNS = ["key", "models", "downloads", "likes", "downloads_7d"]
+
+
+def domain_of(model: HuggingFaceModel) -> str:
+    """タグに含まれるパイプラインタグから分野を判定"""
+    for tag in model.tags:
+        domain = DOMAIN_BY_PIPELINE.get(tag)
+        if domain:
+            return domain
+    return "other"
+
+
+def _is_topic_tag(tag: str) -> bool:
+    return not (
+        tag in NOISE_TAGS
+        or tag.startswith(NOISE_TAG_PREFIXES)
+        or tag.startswith("license:")
+        or tag in DOMAIN_BY_PIPELINE
+    )
+
+
+class ModelAggregates:
+    """収集したモデルのタグ・作者・分野ごとの転置インデックスと集計
+
+    growth にはモデル ID ごとの7日間のダウンロード増加数を渡す（スナップショットの
+    履歴が無いモデルは集計から除外し、該当モデルが無いグループは None）。
+    """
+
+    def __init__(
+        self, models: Iterable[HuggingFaceModel], growth: Optional[Dict[str, float]] = None
+    ):
+        self.models: List[HuggingFaceModel] = list({m.id: m for m in models}.values())
+        self.growth = growth or {}
+        self.by_tag: Dict[str, List[int]] = defaultdict(list)
+        self.by_author: Dict[str, List[int]] = defaultdict(list)
+        self.by_domain: Dict[str, List[int]] = defaultdict(list)
+        for i, model in enumerate(self.models):
+            for tag in dict.fromkeys(model.tags):
+                if _is_topic_tag(tag):
+                    self.by_tag[tag].append(i)
+            self.by_author[model.author or model.id.split("/")[0]].append(i)
+            self.by_domain[domain_of(model)].append(i)
+
+    def models_with_tag(self, tag: str) -> List[HuggingFaceModel]:
+        return [self.models[i] for i in self.by_tag.get(tag, [])]
+
+    def models_by_author(self, author: str) -> List[HuggingFaceModel]:
+        return [self.models[i] for i in self.by_author.get(author, [])]
+
+    def _summarize(self, key: str, indexes: List[int]) -> list:
+        models = [self.models[i] for i in indexes]
+        growth = [
+            self.growth[m.id]
+            for m in models
+            if m.id in self.growth and not math.isnan(self.growth[m.id])
+        ]
+        return [
+            key,
+            len(models),
+            sum(m.stats.downloads for m in models),
+            sum(m.stats.likes for m in models),
+            int(sum(growth)) if growth else None,
+        ]
+
+    def table(self, index: Dict[str, List[int]], min_models: int = 1, top: Optional[int] = None) -> List[list]:
+        """グループごとの [キー, モデル数, ダウンロード合計, いいね合計, 7日間の増加] をダウンロード順に返す"""
+        rows = [
+            self._summarize(key, indexes)
+            for key, indexes in index.items()
+            if len(indexes) >= min_models
+        ]
+        rows.sort(key=lambda row: (-row[2], row[0]))
+        return rows[:top] if top else rows
+
+    def prompt_tables(self, top_authors: int = 10, top_tags: int = 15) -> dict:
+        """プロンプト用の集計表（列名は1回だけ持たせる）"""
+        return {
+            "columns": TABLE_COLUMNS,
+            "domains": self.table(self.by_domain),
+            # 複数モデルを展開している作者の動向
+            "authors": self.table(self.by_author, min_models=2, top=top_authors),
+            "tags": self.table(self.by_tag, min_models=2, top=top_tags),
+        }
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import threading
+import zipfile
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Optional, Tuple
+
+import requests
+
+INDEX_NAME = "index.json"
+ARCHIVE_VERSION = 1
+
+
+class ReplayMissError(LookupError):
+    """再生中のリクエストがアーカイブに記録されていない"""
+
+
+class RunArchive:
+    """1回の実行で発生した外部リクエストを記録・再生する zip アーカイブ
+
+    レスポンス本文は bodies/<key> に圧縮して格納し、ステータスやヘッダーは
+    index.json にまとめる。再生時は index.json だけを読み込み、本文は必要な分だけ取り出す。
+    """
+
+    def __init__(self, path: str, mode: str):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"未対応のモードです: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self._lock = threading.Lock()
+        if mode == "record":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._zip = zipfile.ZipFile(self.path, "w", compression=zipfile.ZIP_DEFLATED)
+            self.index = {}
+        else:
+            self._zip = zipfile.ZipFile(self.path, "r")
+            data = json.loads(self._zip.read(INDEX_NAME))
+            self.index = data["entries"]
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def make_key(kind: str, url: str, params: Optional[dict] = None, body=None) -> str:
+        material = json.dumps([kind, url, params or {}, body], sort_keys=True, default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def record(self, key: str, meta: dict, body: bytes) -> None:
+        """最初の1件だけを記録（同じリクエストは実行内で同じ結果を返す前提）"""
+        with self._lock:
+            if key in self.index or self._zip is None:
+                return
+            self._zip.writestr(f"bodies/{key}", body)
+            self.index[key] = meta
+
+    def replay(self, key: str) -> Tuple[dict, bytes]:
+        meta = self.index.get(key)
+        if meta is None:
+            raise ReplayMissError(f"アーカイブに記録されていないリクエストです: {key}")
+        with self._lock:
+            return meta, self._zip.read(f"bodies/{key}")
+
+    def record_response(self, url: str, params: Optional[dict], response: requests.Response) -> None:
+        meta = {
+            "kind": "http",
+            "url": url,
+            "status": response.status_code,
+            "headers": dict(response.headers),
+            "encoding": response.encoding,
+        }
+        self.record(self.make_key("http", url, params), meta, response.content)
+
+    def replay_response(self, url: str, params: Optional[dict]) -> requests.Response:
+        meta, body = self.replay(self.make_key("http", url, params))
+        response = requests.Response()
+        response.status_code = meta["status"]
+        response.url = meta["url"]
+        # 本文は展開済みのため Content-Encoding は引き継がない
+        response.headers.update(
+            {k: v for k, v in meta["headers"].items() if k.lower() != "content-encoding"}
+        )
+        response.encoding = meta.get("encoding")
+        response._content = body  # pylint: disable=protected-access
+        response.from_cache = False
+        return response
+
+    def record_message(self, request: dict, message, label: Optional[str] = None) -> None:
+        """Claude API の応答（SDK のオブジェクトまたは辞書）を JSON として記録"""
+        if not isinstance(message, dict):
+            dump = getattr(message, "model_dump", None) or message.dict
+            message = dump()
+        body = json.dumps(message, ensure_ascii=False, default=str).encode("utf-8")
+        self.record(self.make_key("anthropic", "messages.create", body=request), {"kind": "anthropic"}, body)
+        # プロンプトが変わった場合の再生用に、用途（label）だけのキーでも保持する
+        self.record(self.make_key("anthropic", "messages.create", body=label), {"kind": "anthropic"}, body)
+
+    def replay_message(self, request: dict, label: Optional[str] = None):
+        """記録した応答を属性アクセスできるオブジェクトとして返す"""
+        try:
+            _, body = self.replay(self.make_key("anthropic", "messages.create", body=request))
+        except ReplayMissError:
+            print(f"プロンプトが記録時と異なるため、記録済みの応答を再生します（{label or 'news_script'}）")
+            _, body = self.replay(self.make_key("anthropic", "messages.create", body=label))
+        return json.loads(body, object_hook=lambda data: SimpleNamespace(**data))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._zip is None:
+                return
+            if self.recording:
+                self._zip.writestr(
+                    INDEX_NAME,
+                    json.dumps({"version": ARCHIVE_VERSION, "entries": self.index}, ensure_ascii=False),
+                )
+            self._zip.close()
+            self._zip = None
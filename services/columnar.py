@@ -0,0 +1,260 @@
+import json
+import os
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from config import Config
+from models.huggingface import HuggingFaceModel
+from services.news_prompt import NOISE_TAG_PREFIXES, NOISE_TAGS
+
+# タグのビットセットの初期幅（64ビット × TAG_WORDS）。辞書が溢れたら倍に広げ、幅は meta.json に記録する
+TAG_WORDS = 4
+
+# 列ごとのファイル名と固定長の型（リトルエンディアン）。tags の幅は meta.json の tag_words
+COLUMNS = {
+    "model": np.dtype("<u4"),  # ids.txt の行番号
+    "date": np.dtype("<M8[D]"),  # 実行日
+    "downloads": np.dtype("<i8"),
+    "likes": np.dtype("<i8"),
+    "last_modified": np.dtype("<M8[s]"),  # 欠損は NaT
+    "tags": None,
+}
+
+META_NAME = "meta.json"
+IDS_NAME = "ids.txt"
+TAGS_NAME = "tags.txt"
+
+
+def _column_path(directory: Path, name: str, tag_words: int = TAG_WORDS) -> Path:
+    # 幅を広げたタグ列は別ファイルに書き、meta.json の更新で切り替える
+    if name == "tags" and tag_words != TAG_WORDS:
+        return directory / f"tags.w{tag_words}.col"
+    return directory / f"{name}.col"
+
+
+def _column_dtype(name: str, tag_words: int = TAG_WORDS) -> np.dtype:
+    if name == "tags":
+        return np.dtype(("<u8", (tag_words,)))
+    return COLUMNS[name]
+
+
+def _is_indexed_tag(tag: str) -> bool:
+    return not (tag in NOISE_TAGS or tag.startswith(NOISE_TAG_PREFIXES))
+
+
+def _to_datetime64(value) -> np.datetime64:
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return np.datetime64(value, "s")
+    if isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return np.datetime64("NaT", "s")
+        return _to_datetime64(parsed)
+    return np.datetime64("NaT", "s")
+
+
+def _load_dictionary(path: Path) -> List[str]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read().splitlines()
+    except OSError:
+        return []
+
+
+class ColumnarSnapshotWriter:
+    """実行日ごとのモデル統計を列ごとの固定長バイナリファイルに追記する
+
+    各列は `<name>.col` に生の配列として追記し、確定済みの行数とタグ列の幅を meta.json に
+    記録する。同じ日付を再度書き込んだ場合は、その日付の行（末尾）を置き換える。
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or Config.COLUMNAR_DIR)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ids = _load_dictionary(self.directory / IDS_NAME)
+        self.id_index = {model_id: i for i, model_id in enumerate(self.ids)}
+        self.tags = _load_dictionary(self.directory / TAGS_NAME)
+        self.tag_index = {tag: i for i, tag in enumerate(self.tags)}
+        self.meta = self._load_meta()
+
+    def _load_meta(self) -> dict:
+        try:
+            with open(self.directory / META_NAME, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {
+                "version": 1,
+                "rows": 0,
+                "last_date": None,
+                "last_date_start": 0,
+                "tag_words": TAG_WORDS,
+            }
+
+    def append(
+        self, models: Iterable[HuggingFaceModel], run_date: Optional[Union[str, date]] = None
+    ) -> int:
+        """モデルの統計を1日分追記し、書き込んだ行数を返す"""
+        run_date = str(run_date or date.today())
+        unique = list({model.id: model for model in models}.values())
+
+        # 同じ日付の再実行はその日付の行を書き直す（日付列は常に昇順）
+        rows = self.meta["rows"]
+        if self.meta["last_date"] == run_date:
+            rows = self.meta["last_date_start"]
+        elif self.meta["last_date"] and run_date < self.meta["last_date"]:
+            raise ValueError(f"{run_date} は最後に書き込んだ日付 {self.meta['last_date']} より前です")
+
+        new_ids = [m.id for m in unique if m.id not in self.id_index]
+        for model_id in new_ids:
+            self.id_index[model_id] = len(self.ids)
+            self.ids.append(model_id)
+        new_tags = []
+        for tag in dict.fromkeys(t for m in unique for t in m.tags):
+            if tag in self.tag_index or not _is_indexed_tag(tag):
+                continue
+            self.tag_index[tag] = len(self.tags)
+            self.tags.append(tag)
+            new_tags.append(tag)
+
+        old_words = self.meta.get("tag_words", TAG_WORDS)
+        tag_words = old_words
+        while tag_words * 64 < len(self.tags):
+            tag_words *= 2
+
+        n = len(unique)
+        columns = {
+            name: np.zeros(n, dtype=_column_dtype(name, tag_words)) for name in COLUMNS
+        }
+        columns["model"][:] = [self.id_index[m.id] for m in unique]
+        columns["date"][:] = np.datetime64(run_date, "D")
+        columns["downloads"][:] = [m.stats.downloads or 0 for m in unique]
+        columns["likes"][:] = [m.stats.likes or 0 for m in unique]
+        columns["last_modified"][:] = [_to_datetime64(m.last_modified) for m in unique]
+        for row, model in enumerate(unique):
+            for tag in model.tags:
+                bit = self.tag_index.get(tag)
+                if bit is not None:
+                    columns["tags"][row, bit // 64] |= np.uint64(1 << (bit % 64))
+
+        # 辞書を先に追記してから列を書き、最後に meta.json で行数を確定する
+        self._append_lines(IDS_NAME, new_ids)
+        self._append_lines(TAGS_NAME, new_tags)
+        if tag_words != old_words:
+            self._widen_tags(rows, old_words, tag_words)
+        for name in COLUMNS:
+            dtype = _column_dtype(name, tag_words)
+            path = _column_path(self.directory, name, tag_words)
+            with open(path, "ab") as f:
+                f.truncate(rows * dtype.itemsize)
+                f.write(columns[name].tobytes())
+
+        self.meta = {
+            "version": 1,
+            "rows": rows + n,
+            "last_date": run_date,
+            "last_date_start": rows,
+            "tag_words": tag_words,
+        }
+        self._write_meta()
+        if tag_words != old_words:
+            _column_path(self.directory, "tags", old_words).unlink(missing_ok=True)
+        return n
+
+    def _widen_tags(self, rows: int, old_words: int, tag_words: int) -> None:
+        """確定済みの行のタグ列を新しい幅のファイルへ書き写す（上位ワードは0）"""
+        old = np.fromfile(
+            _column_path(self.directory, "tags", old_words),
+            dtype=_column_dtype("tags", old_words),
+            count=rows,
+        )
+        widened = np.zeros(rows, dtype=_column_dtype("tags", tag_words))
+        widened[:, :old_words] = old
+        widened.tofile(_column_path(self.directory, "tags", tag_words))
+
+    def _append_lines(self, name: str, lines: List[str]) -> None:
+        if not lines:
+            return
+        with open(self.directory / name, "a", encoding="utf-8") as f:
+            f.write("".join(f"{line}\n" for line in lines))
+
+    def _write_meta(self) -> None:
+        path = self.directory / META_NAME
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, path)
+
+
+class ColumnarSnapshotReader:
+    """列ファイルをメモリマップし、日付範囲のクエリを NumPy のビューで返す"""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or Config.COLUMNAR_DIR)
+        with open(self.directory / META_NAME, encoding="utf-8") as f:
+            meta = json.load(f)
+        self.rows = meta["rows"]
+        self.tag_words = meta.get("tag_words", TAG_WORDS)
+        self.columns: Dict[str, np.ndarray] = {}
+        for name in COLUMNS:
+            dtype = _column_dtype(name, self.tag_words)
+            if self.rows:
+                self.columns[name] = np.memmap(
+                    _column_path(self.directory, name, self.tag_words),
+                    dtype=dtype,
+                    mode="r",
+                    shape=(self.rows,),
+                )
+            else:
+                self.columns[name] = np.empty(0, dtype=dtype)
+        self._ids: Optional[List[str]] = None
+        self._id_index: Optional[Dict[str, int]] = None
+        self._tags: Optional[Dict[str, int]] = None
+
+    @property
+    def ids(self) -> List[str]:
+        """model 列の値（行番号）に対応するモデル ID の一覧（初回参照時に読み込む）"""
+        if self._ids is None:
+            self._ids = _load_dictionary(self.directory / IDS_NAME)
+        return self._ids
+
+    def model_index(self, model_id: str) -> int:
+        if self._id_index is None:
+            self._id_index = {model_id: i for i, model_id in enumerate(self.ids)}
+        return self._id_index[model_id]
+
+    def dates(self) -> np.ndarray:
+        """記録済みの実行日（重複なし）"""
+        return np.unique(self.columns["date"])
+
+    def range(
+        self,
+        start: Optional[Union[str, date]] = None,
+        end: Optional[Union[str, date]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """start 以上 end 以下の実行日の行を列ごとのビュー（コピーなし）で返す"""
+        column = self.columns["date"]
+        lo = 0 if start is None else int(np.searchsorted(column, np.datetime64(str(start), "D"), "left"))
+        hi = self.rows if end is None else int(np.searchsorted(column, np.datetime64(str(end), "D"), "right"))
+        return {name: values[lo:hi] for name, values in self.columns.items()}
+
+    def tag_mask(self, rows: Dict[str, np.ndarray], tag: str) -> np.ndarray:
+        """指定したタグを持つ行の真偽値マスク"""
+        if self._tags is None:
+            self._tags = {t: i for i, t in enumerate(_load_dictionary(self.directory / TAGS_NAME))}
+        bit = self._tags.get(tag)
+        if bit is None or bit >= self.tag_words * 64:
+            return np.zeros(len(rows["tags"]), dtype=bool)
+        word = rows["tags"][:, bit // 64]
+        return (word & np.uint64(1 << (bit % 64))) != 0
+
+    def history(self, model_id: str, **kwargs) -> Dict[str, np.ndarray]:
+        """1モデル分の時系列（日付順）"""
+        rows = self.range(**kwargs)
+        mask = rows["model"] == self.model_index(model_id)
+        return {name: values[mask] for name, values in rows.items()}
@@ -0,0 +1,92 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Iterable, List, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def ordered_map(
+    func: Callable[[T], R], items: Iterable[T], max_workers: int = 1
+) -> List[R]:
+    """入力順を保ったまま func を適用する（max_workers が 1 以下なら逐次実行）"""
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    # executor.map は結果を入力順で返し、例外は該当要素の取り出し時に送出される
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(func, items))
+
+
+def run_in_daemon(func: Callable[..., R], *args, **kwargs) -> "Future[R]":
+    """func をデーモンスレッドで実行し、結果の Future を返す
+
+    ThreadPoolExecutor のワーカーはインタープリタ終了時に完了を待たれるため、
+    期限を過ぎたら待たずに終了したい処理はこちらで実行する。
+    """
+    future: "Future[R]" = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+    threading.Thread(target=run, name=getattr(func, "__name__", "daemon"), daemon=True).start()
+    return future
+
+
+class SingleFlight:
+    """同じキーの呼び出しを1回にまとめ、結果を reset() まで保持する
+
+    実行中の呼び出しと同じキーで呼ばれた場合は、その完了を待って同じ結果を返す。
+    例外は保持せず、次の呼び出しで再実行する。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures: Dict[Hashable, Future] = {}
+        self.hits = 0  # 完了済みの結果を再利用
+        self.shared = 0  # 実行中の呼び出しに相乗り
+        self.misses = 0
+
+    def do(self, key: Hashable, func: Callable[..., R], *args, **kwargs) -> R:
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = self._futures[key] = Future()
+                self.misses += 1
+                owner = True
+            else:
+                if future.done():
+                    self.hits += 1
+                else:
+                    self.shared += 1
+                owner = False
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                self._futures.pop(key, None)
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._futures.clear()
+            self.hits = self.shared = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "shared": self.shared, "misses": self.misses}
@@ -0,0 +1,130 @@
+import json
+import os
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from config import Config
+from models.huggingface import HuggingFaceModel
+from services.http import HttpClient, get_http_client
+
+# カタログ巡回時に展開するフィールド
+CATALOG_EXPAND_FIELDS = [
+    "author",
+    "downloads",
+    "likes",
+    "tags",
+    "lastModified",
+    "private",
+    "pipeline_tag",
+]
+
+
+class ModelCatalogCrawler:
+    """Link ヘッダーのカーソルをたどってモデル一覧全体を巡回する
+
+    ページは呼び出し側が保存した後に commit_checkpoint() で確定させる。確定前に中断した
+    ページは、次回の再開時にもう一度取得される。
+    """
+
+    def __init__(
+        self,
+        http: Optional[HttpClient] = None,
+        checkpoint_path: Optional[str] = None,
+        page_size: Optional[int] = None,
+        sort: str = "downloads",
+    ):
+        self.http = http or get_http_client()
+        self.checkpoint_path = Path(checkpoint_path or Config.CRAWL_CHECKPOINT)
+        self.params = {
+            "sort": sort,
+            "direction": -1,
+            "limit": str(page_size or Config.CRAWL_PAGE_SIZE),
+            "expand[]": CATALOG_EXPAND_FIELDS,
+        }
+        # 最後に返したページの次の再開位置（URL, 累計件数, ページ内の読み飛ばし件数）。
+        # commit_checkpoint で保存し、URL が None なら巡回完了としてチェックポイントを消す
+        self._pending: Optional[Tuple[Optional[str], int, int]] = None
+
+    def crawl_pages(self, max_models: Optional[int] = None) -> Iterator[List[HuggingFaceModel]]:
+        """モデル一覧を1ページずつ返すジェネレーター（中断時は確定済みのチェックポイントから再開）"""
+        checkpoint = self._load_checkpoint()
+        if checkpoint:
+            url, params = checkpoint["next_url"], None
+            count = checkpoint["count"]
+            skip = checkpoint.get("skip", 0)
+            print(f"チェックポイントから巡回を再開します（取得済み: {count}件）")
+        else:
+            url, params = Config.HF_API_URL, self.params
+            count = skip = 0
+
+        while url:
+            if max_models and count >= max_models:
+                print(f"巡回済みの件数が上限（{max_models}件）に達しています")
+                return
+            response = self.http.get(url, params=params, timeout=60)
+            response.raise_for_status()
+
+            # メモリ使用量を一定に保つため、ページ単位で処理して破棄する
+            rows = response.json()
+            page = [HuggingFaceModel.from_api_response(data) for data in rows[skip:]]
+            next_url = response.links.get("next", {}).get("url")
+            if max_models and count + len(page) > max_models:
+                # 上限で打ち切ったページは途中の位置を記録し、次回は残りから再開する
+                page = page[: max_models - count]
+                count += len(page)
+                skip += len(page)
+                self._pending = (response.url, count, skip)
+                yield page
+                return
+            count += len(page)
+
+            url, params, skip = next_url, None, 0
+            self._pending = (url, count, 0)
+            yield page
+
+    def commit_checkpoint(self) -> None:
+        """直前に返したページの保存完了後に呼び、再開位置を次のページへ進める"""
+        if self._pending is None:
+            return
+        next_url, count, skip = self._pending
+        self._pending = None
+        if next_url:
+            self._save_checkpoint(next_url, count, skip)
+        else:
+            self.clear_checkpoint()
+
+    def clear_checkpoint(self) -> None:
+        try:
+            self.checkpoint_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _load_checkpoint(self) -> Optional[dict]:
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # 巡回条件が変わっている場合は古いカーソルを使わない
+        if checkpoint.get("params") != self._params_signature():
+            return None
+        return checkpoint
+
+    def _save_checkpoint(self, next_url: str, count: int, skip: int = 0) -> None:
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "next_url": next_url,
+                    "count": count,
+                    "skip": skip,
+                    "params": self._params_signature(),
+                },
+                f,
+            )
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _params_signature(self) -> dict:
+        return {"url": Config.HF_API_URL, **self.params}
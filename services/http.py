@@ -0,0 +1,155 @@
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import Config
+from instrumentation import metrics, record_http
+from services.archive import RunArchive
+from services.http_cache import HttpCache
+from services.rate_limit import RateLimiter, get_rate_limiter, parse_retry_after
+
+DEFAULT_HEADERS = {
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+}
+
+# 一時的なサーバーエラーとして再試行するステータス
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+class HttpClient:
+    """keep-alive とリトライ付きのコネクションプールを共有する HTTP クライアント"""
+
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        retries: Optional[int] = None,
+        backoff_factor: Optional[float] = None,
+        cache: Optional[HttpCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        archive: Optional[RunArchive] = None,
+    ):
+        self.cache = cache
+        self.archive = archive
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.pool_size = pool_size or Config.HTTP_POOL_SIZE or Config.FETCH_WORKERS
+        retries = Config.HTTP_RETRIES if retries is None else retries
+        backoff_factor = (
+            Config.HTTP_BACKOFF_FACTOR if backoff_factor is None else backoff_factor
+        )
+
+        # 接続リセット・読み込み失敗・5xx を指数バックオフで再試行する
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            raise_on_status=False,
+            # 429 の Retry-After はホスト単位の共有リミッターで扱う
+            respect_retry_after_header=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=retry,
+        )
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        timeout: float = 30,
+        cache: bool = False,
+        service: str = "huggingface",
+    ) -> requests.Response:
+        """GET リクエストを送信（cache=True なら条件付きリクエストでキャッシュを再検証）
+
+        service は計測用のラベルで、サービスごとにリクエスト数・バイト数などを集計する。
+        429 はホスト単位のレートリミッターで Retry-After に従って待機し、再試行する。
+        archive が再生モードの場合はネットワークを使わず記録済みのレスポンスを返す。
+        """
+        if self.archive and self.archive.replaying:
+            response = self.archive.replay_response(url, params)
+            metrics.incr(service, "replayed")
+            return response
+
+        response = self._get(url, params, headers, timeout, cache, service)
+        if self.archive and self.archive.recording:
+            self.archive.record_response(url, params, response)
+        return response
+
+    def _get(
+        self,
+        url: str,
+        params: Optional[dict],
+        headers: Optional[dict],
+        timeout: float,
+        cache: bool,
+        service: str,
+    ) -> requests.Response:
+        entry = None
+        if cache and self.cache:
+            entry = self.cache.lookup(url, params)
+            if entry:
+                headers = {**(headers or {}), **self.cache.conditional_headers(entry)}
+
+        response = self._send(url, params, headers, timeout, service)
+        revalidated = bool(cache and self.cache and entry and response.status_code == 304)
+        record_http(service, response, revalidated if cache and self.cache else None)
+
+        if cache and self.cache:
+            if revalidated:
+                return self.cache.revalidated(entry, response)
+            if response.status_code == 200:
+                self.cache.store(url, params, response)
+        return response
+
+    def _send(
+        self, url: str, params: Optional[dict], headers: Optional[dict], timeout: float, service: str
+    ) -> requests.Response:
+        limiter = self.rate_limiter.for_url(url)
+        for attempt in range(Config.RATE_LIMIT_RETRIES + 1):
+            limiter.acquire()
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=timeout)
+            except BaseException:
+                limiter.release("error")
+                raise
+            if response.status_code != 429:
+                limiter.release("ok" if response.status_code < 500 else "error")
+                return response
+
+            metrics.incr(service, "rate_limited")
+            wait = limiter.release("throttled", parse_retry_after(response.headers.get("Retry-After")))
+            if attempt < Config.RATE_LIMIT_RETRIES:
+                print(f"レート制限に到達しました（{service}）。{wait:.1f}秒後に再試行します")
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+_shared_client: Optional[HttpClient] = None
+_shared_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """プロセス内で共有する HttpClient を取得"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient()
+        return _shared_client
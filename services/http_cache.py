@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import requests
+
+from config import Config
+from services.lru import LRUCache
+
+
+class HttpCache:
+    """ETag / Last-Modified による再検証付きのディスクキャッシュ"""
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None,
+    ):
+        self.directory = Path(directory or Config.HTTP_CACHE_DIR)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = Config.HTTP_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.max_age = Config.HTTP_CACHE_MAX_AGE if max_age is None else max_age
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        # 長時間稼働時にディスクを読み直さないよう、最近使ったエントリを保持する
+        self.memory = LRUCache(Config.MEMORY_CACHE_SIZE)
+        self.evict()
+
+    @staticmethod
+    def make_key(url: str, params: Optional[dict] = None) -> str:
+        """URL とクエリパラメータからキャッシュキーを生成"""
+        normalized = json.dumps(
+            [url, sorted((params or {}).items())], ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str):
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def lookup(self, url: str, params: Optional[dict] = None) -> Optional[dict]:
+        """キャッシュエントリのメタデータを取得（期限切れは破棄）"""
+        key = self.make_key(url, params)
+        cached = self.memory.get(key)
+        if cached and time.time() - cached[0]["stored_at"] <= self.max_age:
+            return dict(cached[0])
+
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get("stored_at", 0) > self.max_age or not body_path.exists():
+            self._remove(key)
+            return None
+
+        entry["key"] = key
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry: dict) -> dict:
+        """条件付きリクエスト用のヘッダーを作成"""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(
+        self, url: str, params: Optional[dict], response: requests.Response
+    ) -> None:
+        """検証子を持つ 200 レスポンスを保存"""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        key = self.make_key(url, params)
+        meta_path, body_path = self._paths(key)
+        body = response.content
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": response.headers.get("Content-Type"),
+            "encoding": response.encoding,
+            "size": len(body),
+            "stored_at": time.time(),
+        }
+
+        self._write_atomic(body_path, body)
+        self._write_atomic(meta_path, json.dumps(entry).encode("utf-8"))
+        self.memory.put(key, (dict(entry, key=key), body))
+
+        with self._lock:
+            self._total_bytes += len(body)
+            over_limit = self._total_bytes > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def revalidated(self, entry: dict, response: requests.Response) -> requests.Response:
+        """304 応答に対してキャッシュ済みの本文で 200 レスポンスを組み立てる"""
+        key = entry["key"]
+        meta_path, body_path = self._paths(key)
+        entry = dict(entry, stored_at=time.time())
+        entry.pop("key", None)
+        self._write_atomic(meta_path, json.dumps(entry).encode("utf-8"))
+
+        cached_body = self.memory.get(key)
+        body = cached_body[1] if cached_body else body_path.read_bytes()
+        self.memory.put(key, (dict(entry, key=key), body))
+
+        cached = requests.Response()
+        cached.status_code = 200
+        cached.url = response.url
+        cached.request = response.request
+        cached.headers.update(response.headers)
+        if entry.get("content_type"):
+            cached.headers["Content-Type"] = entry["content_type"]
+        cached.encoding = entry.get("encoding")
+        cached._content = body  # pylint: disable=protected-access
+        cached.from_cache = True
+        return cached
+
+    def evict(self) -> None:
+        """期限切れエントリを削除し、上限を超えた分を古い順に削除"""
+        with self._lock:
+            now = time.time()
+            entries = []
+            for meta_path in self.directory.glob("*.json"):
+                key = meta_path.stem
+                try:
+                    with open(meta_path, encoding="utf-8") as f:
+                        entry = json.load(f)
+                except (OSError, ValueError):
+                    self._remove(key)
+                    continue
+                if now - entry.get("stored_at", 0) > self.max_age:
+                    self._remove(key)
+                    continue
+                entries.append((entry.get("stored_at", 0), entry.get("size", 0), key))
+
+            total = sum(size for _, size, _ in entries)
+            # 最後に保存・再検証された時刻が古いものから削除
+            for _, size, key in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(key)
+                total -= size
+            self._total_bytes = total
+
+    def _remove(self, key: str) -> None:
+        self.memory.pop(key)
+        for path in self._paths(key):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
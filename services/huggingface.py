@@ -1,41 +1,157 @@
-from datetime import datetime
-from typing import List, Optional
-import requests
+import json
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
 from models.huggingface import HuggingFaceModel, ModelCommit, TrendReason
 from config import Config
+from instrumentation import metrics
+from services.concurrency import SingleFlight, ordered_map
+from services.http import HttpClient, get_http_client
+from services.lru import LRUCache
+from services.snapshot import SnapshotStore
+
+# トレンド一覧の取得時に展開するフィールド（expand 指定時は指定分のみ返される）
+TRENDING_EXPAND_FIELDS = [
+    "author",
+    "downloads",
+    "likes",
+    "tags",
+    "lastModified",
+    "private",
+    "pipeline_tag",
+    "trendingScore",
+]
+
+_ARRAY_SEPARATORS = re.compile(r"[\s,]*")
+
+
+def iter_json_array(text: str) -> Iterator:
+    """JSON 配列の要素を先頭から1つずつデコード（途中で止めれば残りは解析しない）"""
+    decoder = json.JSONDecoder()
+    index = text.index("[") + 1
+    while True:
+        index = _ARRAY_SEPARATORS.match(text, index).end()
+        if index >= len(text) or text[index] == "]":
+            return
+        value, index = decoder.raw_decode(text, index)
+        yield value
+
+
+def _to_commit(commit: dict) -> ModelCommit:
+    return ModelCommit(
+        title=commit.get("title", ""),
+        date=commit.get("date", ""),  # 参照時に datetime へ変換
+        description=commit.get("description"),
+    )
 
 
 class HuggingFaceService:
-    def __init__(self):
-        self.headers = {
-            "Accept": "application/json",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        http: Optional[HttpClient] = None,
+        snapshot_store: Optional[SnapshotStore] = None,
+    ):
+        self.max_workers = max_workers or Config.FETCH_WORKERS
+        self.http = http or get_http_client()
+        self.snapshot_store = snapshot_store
+        # (model_id, lastModified) をキーにしたコミット履歴のメモリキャッシュ
+        self.commit_cache = LRUCache(Config.MEMORY_CACHE_SIZE)
+        # 実行単位のメモ化（トレンドと人気の両方に含まれるモデルの重複取得を防ぐ）
+        self.memo = {
+            "details": SingleFlight(),
+            "commits": SingleFlight(),
         }
 
+    def reset_memo(self) -> None:
+        """実行ごとのメモ化結果を破棄"""
+        for flight in self.memo.values():
+            flight.reset()
+
+    def memo_stats(self) -> Dict[str, dict]:
+        return {name: flight.stats() for name, flight in self.memo.items()}
+
     def get_model_details(self, model_id: str) -> Optional[dict]:
         """モデルの詳細情報を取得"""
+        return self.memo["details"].do(model_id, self._fetch_model_details, model_id)
+
+    @metrics.timed("details")
+    def _fetch_model_details(self, model_id: str) -> Optional[dict]:
         url = f"{Config.HF_API_URL}/{model_id}"
-        response = requests.get(url, headers=self.headers, timeout=30)
+        response = self.http.get(url, timeout=30, cache=True)
         return response.json() if response.status_code == 200 else None
 
     def get_model_commits(self, model_id: str, limit: int = 3) -> List[ModelCommit]:
         """モデルの最近のコミット履歴を取得"""
+        commits = self.memo["commits"].do(
+            (model_id, limit), self._fetch_model_commits, model_id, limit
+        )
+        return list(commits)
+
+    @metrics.timed("commits")
+    def _fetch_model_commits(self, model_id: str, limit: int) -> List[ModelCommit]:
         url = f"{Config.HF_BASE_URL}/api/models/{model_id}/commits"
-        response = requests.get(url, headers=self.headers, timeout=30)
+        if Config.COMMIT_FETCH_MODE != "incremental":
+            response = self.http.get(url, timeout=30, cache=True)
+            if response.status_code != 200:
+                return []
+            return [_to_commit(commit) for commit in response.json()[:limit]]
+
+        # 先頭ページだけを件数指定で取得し、前回の最新コミットに到達したら解析を打ち切る
+        cursor = self.snapshot_store.commit_cursor(model_id) if self.snapshot_store else None
+        response = self.http.get(url, params={"limit": limit}, timeout=30, cache=True)
         if response.status_code != 200:
             return []
+        new_commits, head_id, reached = self._read_new_commits(
+            response.text, cursor[0] if cursor else None, limit
+        )
+        metrics.incr("huggingface", "commits_new", len(new_commits))
+        if reached:
+            metrics.incr("huggingface", "commit_cursor_hits")
+            commits = (new_commits + cursor[1])[:limit]
+        else:
+            commits = new_commits
 
-        commits = []
-        for commit in response.json()[:limit]:
-            commits.append(
-                ModelCommit(
-                    title=commit.get("title", ""),
-                    date=datetime.fromisoformat(
-                        commit.get("date", "").replace("Z", "+00:00")
-                    ),
-                    description=commit.get("description"),
-                )
-            )
+        if self.snapshot_store and head_id and (not cursor or new_commits):
+            self.snapshot_store.save_commit_cursor(model_id, head_id, commits)
+        return commits
+
+    @staticmethod
+    def _read_new_commits(
+        text: str, cursor_id: Optional[str], limit: int
+    ) -> Tuple[List[ModelCommit], Optional[str], bool]:
+        """前回の最新コミット（cursor_id）より新しいコミットを最大 limit 件読み取る
+
+        (新しいコミット, 先頭のコミット ID, cursor_id に到達したか) を返す。
+        """
+        new_commits: List[ModelCommit] = []
+        head_id = None
+        for commit in iter_json_array(text):
+            if head_id is None:
+                head_id = commit.get("id")
+            if cursor_id and commit.get("id") == cursor_id:
+                return new_commits, head_id, True
+            if len(new_commits) >= limit:
+                break
+            new_commits.append(_to_commit(commit))
+        return new_commits, head_id, False
+
+    def load_model_commits(self, model: HuggingFaceModel) -> List[ModelCommit]:
+        """コミット履歴を取得（前回取得時から更新が無ければ再利用）"""
+        cache_key = (model.id, str(model.last_modified)) if model.last_modified else None
+        if cache_key:
+            commits = self.commit_cache.get(cache_key)
+            if commits is not None:
+                metrics.incr("huggingface", "memory_cache_hits")
+                return list(commits)
+
+        commits = None
+        if self.snapshot_store:
+            commits = self.snapshot_store.unchanged_commits(model)
+        if commits is None:
+            commits = self.get_model_commits(model.id)
+
+        if cache_key:
+            self.commit_cache.put(cache_key, tuple(commits))
         return commits
 
     def analyze_trend_reasons(self, model: HuggingFaceModel) -> List[TrendReason]:
@@ -62,6 +178,7 @@ class HuggingFaceService:
 
         return reasons
 
+    @metrics.timed("popular_list")
     def get_popular_models(self, limit: int = 10) -> List[HuggingFaceModel]:
         """人気のモデルを取得"""
         params = {
@@ -71,24 +188,44 @@ class HuggingFaceService:
             "full": "true",
         }
 
-        response = requests.get(Config.HF_API_URL, params=params, headers=self.headers, timeout=30)
+        response = self.http.get(Config.HF_API_URL, params=params, timeout=30)
         if response.status_code != 200:
             return []
 
-        models = []
-        for data in response.json():
-            model = HuggingFaceModel.from_api_response(data)
-            model.recent_commits = self.get_model_commits(model.id)
-            models.append(model)
+        models = [HuggingFaceModel.from_api_response(data) for data in response.json()]
+
+        # コミット履歴はモデルごとに独立しているため並列に取得する
+        commits = ordered_map(self.load_model_commits, models, self.max_workers)
+        for model, recent_commits in zip(models, commits):
+            model.recent_commits = recent_commits
 
         return models
 
+    @metrics.timed("trending_list")
+    def get_trending_models(self, limit: int = 10) -> List[HuggingFaceModel]:
+        """Hub API のトレンド順ソートでトレンドモデルを取得"""
+        params = {
+            "sort": "trendingScore",
+            "direction": -1,
+            "limit": str(limit),
+            "expand[]": TRENDING_EXPAND_FIELDS,
+        }
+
+        response = self.http.get(Config.HF_API_URL, params=params, timeout=30)
+        if response.status_code != 200:
+            return []
+
+        # 一覧のレスポンスに詳細情報が含まれるため、個別の詳細取得は不要
+        models = [HuggingFaceModel.from_api_response(data) for data in response.json()]
+        return ordered_map(self.enrich_model_data, models, self.max_workers)
+
+    @metrics.timed("enrichment")
     def enrich_model_data(
         self, model: HuggingFaceModel, trend_data: Optional[dict] = None
     ) -> HuggingFaceModel:
         """モデル情報を充実させる"""
         # コミット履歴の取得
-        model.recent_commits = self.get_model_commits(model.id)
+        model.recent_commits = self.load_model_commits(model)
 
         # トレンド理由を分析
         trend_reasons = []
@@ -0,0 +1,107 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+from config import Config
+from instrumentation import metrics
+from models.huggingface import HuggingFaceModel
+from services.concurrency import ordered_map
+from services.http import HttpClient
+from services.http_cache import HttpCache
+from services.huggingface import HuggingFaceService
+from services.rate_limit import RateLimiter
+
+SHARD_KEYS = ("hash", "author")
+
+# ワーカープロセスごとに1つ生成し、シャード間で接続プールを再利用する
+_worker_service: Optional[HuggingFaceService] = None
+
+
+def shard_of(model_id: str, shards: int, shard_by: str = "hash") -> int:
+    """モデル ID の割り当て先シャード番号（プロセスや実行をまたいで安定）"""
+    key = model_id
+    if shard_by == "author":
+        key = model_id.split("/", 1)[0] if "/" in model_id else ""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shards
+
+
+def partition(
+    model_ids: Iterable[str], shards: int, shard_by: str = "hash"
+) -> List[List[Tuple[int, str]]]:
+    """(入力順の位置, モデル ID) をシャードごとに振り分ける"""
+    buckets: List[List[Tuple[int, str]]] = [[] for _ in range(shards)]
+    for position, model_id in enumerate(model_ids):
+        buckets[shard_of(model_id, shards, shard_by)].append((position, model_id))
+    return [bucket for bucket in buckets if bucket]
+
+
+def _init_worker(threads: int, use_cache: bool, processes: int) -> None:
+    global _worker_service
+    # レート上限はプロセス間で等分する（429 時の待機は各プロセスのリミッターが行う）
+    http = HttpClient(
+        pool_size=threads,
+        cache=HttpCache() if use_cache else None,
+        rate_limiter=RateLimiter(scale=1 / processes),
+    )
+    _worker_service = HuggingFaceService(max_workers=threads, http=http)
+
+
+def _ingest_model(model_id: str) -> Optional[HuggingFaceModel]:
+    details = _worker_service.get_model_details(model_id)
+    if not details:
+        return None
+    return _worker_service.enrich_model_data(HuggingFaceModel.from_api_response(details))
+
+
+def _ingest_shard(shard: List[Tuple[int, str]]) -> Tuple[List[Tuple[int, HuggingFaceModel]], dict]:
+    """ワーカープロセスで1シャード分の取得・解析・エンリッチを実行"""
+    metrics.reset()
+    _worker_service.reset_memo()
+    models = ordered_map(
+        _ingest_model, [model_id for _, model_id in shard], _worker_service.max_workers
+    )
+    results = [(position, model) for (position, _), model in zip(shard, models) if model]
+    return results, metrics.report()
+
+
+class ShardedIngestor:
+    """モデル ID をシャードに分割し、プロセスプールで並列にモデル情報を構築する"""
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        threads: Optional[int] = None,
+        shard_by: Optional[str] = None,
+        use_cache: bool = True,
+    ):
+        self.processes = processes or Config.INGEST_PROCESSES or os.cpu_count() or 1
+        self.shard_by = shard_by or Config.INGEST_SHARD_BY
+        if self.shard_by not in SHARD_KEYS:
+            raise ValueError(f"未対応のシャードキーです: {self.shard_by}")
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            initializer=_init_worker,
+            initargs=(threads or Config.FETCH_WORKERS, use_cache, self.processes),
+        )
+
+    def ingest(self, model_ids: List[str]) -> List[HuggingFaceModel]:
+        """モデル情報を取得し、入力順に並べて返す（取得できなかったモデルは除外）"""
+        # 負荷を均すため、プロセス数より多めのシャードに分割する
+        shards = partition(model_ids, self.processes * 4, self.shard_by)
+        merged: List[Tuple[int, HuggingFaceModel]] = []
+        for results, report in self.executor.map(_ingest_shard, shards):
+            merged.extend(results)
+            metrics.merge(report)
+        merged.sort(key=lambda item: item[0])
+        return [model for _, model in merged]
+
+    def close(self) -> None:
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from config import Config
+from models.huggingface import HuggingFaceModel
+
+# 傾向分析に寄与しない定型タグ
+NOISE_TAG_PREFIXES = ("region:", "arxiv:", "doi:", "base_model:", "dataset:")
+NOISE_TAGS = {
+    "endpoints_compatible",
+    "autotrain_compatible",
+    "text-generation-inference",
+    "has_space",
+    "safetensors",
+    "custom_code",
+}
+
+# 予算超過時に段階的に適用する圧縮レベル（説明文字数, タグ数, コミット数）
+COMPACTION_LEVELS = [(300, 10, 2), (160, 6, 1), (80, 4, 0), (0, 3, 0)]
+# 分野・作者・タグの集計表を渡す場合は、モデルごとのタグを省いて説明も短くする
+AGGREGATED_COMPACTION_LEVELS = [(160, 0, 1), (80, 0, 0), (0, 0, 0)]
+
+
+def estimate_tokens(text: str) -> int:
+    """トークン数の概算（日本語を含む JSON を想定して3文字≒1トークン）"""
+    return len(text) // 3 + 1
+
+
+def _clean_tags(tags: Iterable[str], max_tags: int) -> List[str]:
+    seen = []
+    for tag in tags:
+        if tag in NOISE_TAGS or tag.startswith(NOISE_TAG_PREFIXES) or tag in seen:
+            continue
+        seen.append(tag)
+    return seen[:max_tags]
+
+
+def _trim(text: Optional[str], limit: int) -> Optional[str]:
+    if not text or limit <= 0:
+        return None
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+def compact_model(
+    model: HuggingFaceModel, description_chars: int, max_tags: int, max_commits: int
+) -> dict:
+    """モデルを空値を省いた最小限の辞書に変換"""
+    last_modified = (
+        model.last_modified.isoformat()
+        if isinstance(model.last_modified, datetime)
+        else model.last_modified
+    )
+    data = {
+        "id": model.id,
+        "author": model.author if not model.id.startswith(f"{model.author}/") else None,
+        "description": _trim(model.description, description_chars),
+        "downloads": model.stats.downloads,
+        "likes": model.stats.likes,
+        "recent_downloads": model.stats.recent_downloads,
+        "tags": _clean_tags(model.tags, max_tags),
+        "last_modified": (last_modified or "")[:10] or None,
+        "trend_reasons": sorted({reason.description for reason in model.trend_reasons}),
+        "recent_commits": [
+            f"{commit.date.strftime('%Y-%m-%d')} {_trim(commit.title, 80)}"
+            for commit in model.recent_commits[:max_commits]
+        ],
+    }
+    return {key: value for key, value in data.items() if value not in (None, [], "")}
+
+
+def build_news_payload(
+    trending_models: List[HuggingFaceModel],
+    popular_models: List[HuggingFaceModel],
+    token_budget: Optional[int] = None,
+    aggregates: Optional[dict] = None,
+) -> str:
+    """プロンプト用のモデルデータをトークン予算内の最小化 JSON に変換
+
+    aggregates（ModelAggregates.prompt_tables() の結果）を渡すと集計表を先頭に含める。
+    """
+    token_budget = token_budget or Config.NEWS_PROMPT_TOKEN_BUDGET
+    trending = list(trending_models)
+    popular = list(popular_models)
+    levels = AGGREGATED_COMPACTION_LEVELS if aggregates else COMPACTION_LEVELS
+
+    for level in levels:
+        payload = _encode(trending, popular, aggregates, *level)
+        if estimate_tokens(payload) <= token_budget:
+            return payload
+
+    # 最も圧縮しても収まらない場合は、各リストの上位何件まで残せるかを二分探索する
+    level = levels[-1]
+    best = _encode([], [], aggregates, *level)
+    low, high = 0, max(len(trending), len(popular))
+    while low < high:
+        keep = (low + high + 1) // 2
+        payload = _encode(trending[:keep], popular[:keep], aggregates, *level)
+        if estimate_tokens(payload) <= token_budget:
+            best, low = payload, keep
+        else:
+            high = keep - 1
+    return best
+
+
+def _encode(
+    trending: List[HuggingFaceModel],
+    popular: List[HuggingFaceModel],
+    aggregates: Optional[dict],
+    description_chars: int,
+    max_tags: int,
+    max_commits: int,
+) -> str:
+    trending_ids = {model.id for model in trending}
+    data = {
+        "date": datetime.now().strftime("%Y-%m-%d"),
+        "aggregates": aggregates,
+        "trending_models": [
+            compact_model(model, description_chars, max_tags, max_commits)
+            for model in trending
+        ],
+        # トレンドにも含まれるモデルは重複を避けて数値のみ
+        "popular_models": [
+            {
+                "id": model.id,
+                "downloads": model.stats.downloads,
+                "likes": model.stats.likes,
+                "also_trending": True,
+            }
+            if model.id in trending_ids
+            else compact_model(model, description_chars, max_tags, max_commits)
+            for model in popular
+        ],
+    }
+    if not aggregates:
+        del data["aggregates"]
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+class ScriptCache:
+    """正規化した入力のハッシュをキーに生成済みの原稿を保存するディスクキャッシュ"""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or Config.NEWS_SCRIPT_CACHE_DIR)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return (self.directory / f"{key}.txt").read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def put(self, key: str, script: str) -> None:
+        path = self.directory / f"{key}.txt"
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(script, encoding="utf-8")
+        os.replace(tmp_path, path)
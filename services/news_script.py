@@ -0,0 +1,116 @@
+import json
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional
+
+from config import Config
+from models.huggingface import HuggingFaceModel
+from services.aggregates import domain_of
+from services.news_prompt import build_news_payload
+
+# 分野別セクションの上限数と、セクションにする最小モデル数
+MAX_DOMAIN_SECTIONS = 4
+MIN_DOMAIN_MODELS = 3
+
+DOMAIN_TITLES = {
+    "text": "テキスト・言語モデル",
+    "image": "画像",
+    "audio": "音声",
+    "video": "動画",
+    "3d": "3D生成",
+    "multimodal": "マルチモーダル",
+    "rl": "強化学習・ロボティクス",
+    "tabular": "表形式データ・時系列",
+}
+
+SCRIPT_GUIDELINES = """1. トレンドの分析（複数のモデルを展開している企業の動向、注目分野での進展など）
+2. 数値の効果的な活用（ダウンロード数などの具体的な数字を適切に含める）
+3. 分野別の動向（音声、画像、3D生成など）
+4. 長期的な視点でのモデル採用状況
+5. 業界全体のトレンドの示唆
+6. 各モデルのトレンド理由や最近のアップデート情報も含める"""
+
+
+class NewsSection(NamedTuple):
+    name: str  # 記録・再生のキーにも使う識別子
+    title: str
+    trending: List[HuggingFaceModel]
+    popular: List[HuggingFaceModel]
+
+
+def use_map_reduce(
+    trending_models: List[HuggingFaceModel], popular_models: List[HuggingFaceModel]
+) -> bool:
+    """NEWS_SCRIPT_MODE とモデル数から map-reduce で生成するかを判定"""
+    if Config.NEWS_SCRIPT_MODE == "map_reduce":
+        return True
+    if Config.NEWS_SCRIPT_MODE != "auto":
+        return False
+    count = len({model.id for model in [*trending_models, *popular_models]})
+    return count > Config.NEWS_SCRIPT_MAP_REDUCE_THRESHOLD
+
+
+def split_sections(
+    trending_models: List[HuggingFaceModel], popular_models: List[HuggingFaceModel]
+) -> List[NewsSection]:
+    """トレンド・累計人気と、モデル数の多い分野ごとのセクションに分割"""
+    sections = [
+        NewsSection("trending", "最新のトレンドモデル", list(trending_models), []),
+        NewsSection("popular", "累計人気モデル", [], list(popular_models)),
+    ]
+    domains = Counter(
+        domain_of(model)
+        for model in {m.id: m for m in [*trending_models, *popular_models]}.values()
+    )
+    top = [
+        domain
+        for domain, count in domains.most_common()
+        if domain != "other" and count >= MIN_DOMAIN_MODELS
+    ][:MAX_DOMAIN_SECTIONS]
+    for domain in top:
+        sections.append(
+            NewsSection(
+                f"domain:{domain}",
+                f"{DOMAIN_TITLES.get(domain, domain)}分野のモデル",
+                [m for m in trending_models if domain_of(m) == domain],
+                [m for m in popular_models if domain_of(m) == domain],
+            )
+        )
+    return sections
+
+
+def section_prompt(section: NewsSection, token_budget: Optional[int] = None) -> str:
+    """セクション1つ分の要約（map）プロンプト"""
+    payload = build_news_payload(
+        section.trending,
+        section.popular,
+        token_budget=token_budget or Config.NEWS_SECTION_TOKEN_BUDGET,
+    )
+    return f"""以下は Hugging Face の「{section.title}」のデータです。
+ニュース原稿の材料として、注目すべきモデル、具体的な数値（ダウンロード数・いいね数）、
+トレンド理由や最近のアップデート、企業・分野の動向を日本語の箇条書きで簡潔に要約してください。
+
+```json
+{payload}
+```"""
+
+
+def reduce_prompt(summaries: Dict[str, str], aggregates: Optional[dict] = None) -> str:
+    """セクションごとの要約を1本の原稿にまとめる（reduce）プロンプト"""
+    parts = [f"## {title}\n{summary.strip()}" for title, summary in summaries.items()]
+    tables = ""
+    if aggregates:
+        tables = (
+            "\n\n# 集計表\n分野別（domains）・作者別（authors）・タグ別（tags）の集計で、"
+            "各行は columns の順（キー, モデル数, ダウンロード合計, いいね合計, 7日間のダウンロード増加）です。\n"
+            f"```json\n{json.dumps(aggregates, ensure_ascii=False, separators=(',', ':'))}\n```"
+        )
+    return f"""以下は Hugging Face の最新のモデルトレンドと累計人気モデルについて、セクションごとにまとめた要約です。
+これを基に、AIニュースキャスターが読み上げることを想定したトレンド分析のニュース原稿を作成してください。
+
+# セクション別の要約
+{chr(10).join(parts)}{tables}
+
+以下の点を意識して原稿を作成してください：
+{SCRIPT_GUIDELINES}
+
+なお、原稿は聞き手が理解しやすい、自然な話し言葉で作成してください。"""
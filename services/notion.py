@@ -1,17 +1,81 @@
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError, wait
 from datetime import datetime
-from typing import List
-import json
-from anthropic import Anthropic
-from notion_client import Client
+from functools import cached_property
+from types import SimpleNamespace
+from typing import Dict, List, Optional
 from config import Config
+from instrumentation import metrics
 from models.huggingface import HuggingFaceModel
+from services.concurrency import run_in_daemon
+from services.news_prompt import ScriptCache, build_news_payload
+from services.news_script import reduce_prompt, section_prompt, split_sections, use_map_reduce
+from services.rate_limit import ANTHROPIC_API_URL, get_rate_limiter, parse_retry_after
+
+NEWS_SCRIPT_MODEL = "claude-3-sonnet-20240229"
+
+NEWS_SCRIPT_PLACEHOLDER = "ニュース原稿を生成中です..."
+NEWS_SCRIPT_TIMEOUT_MESSAGE = "ニュース原稿は期限内に生成できなかったため、今回は掲載を見送りました。"
+
+# レート制限・過負荷として共有リミッターで待機してから再試行するステータス
+ANTHROPIC_THROTTLE_STATUSES = (429, 529)
+# SDK の既定と同様に、バックオフして再試行する一時的なエラーのステータス（5xx も対象）
+ANTHROPIC_TRANSIENT_STATUSES = (408, 409)
+
+# map-reduce 生成で、持ち時間のうち要約（map）フェーズに割り当てる割合
+MAP_PHASE_SHARE = 0.6
+SECTION_MAX_TOKENS = 600
 
 
 class NotionService:
-    def __init__(self):
-        self.client = Client(auth=Config.NOTION_TOKEN)
+    def __init__(self, script_cache: Optional[ScriptCache] = None, archive=None):
+        self.script_cache = script_cache
+        # 記録・再生用の RunArchive（Claude API の呼び出しのみが対象）
+        self.archive = archive
         self.database_id = Config.NOTION_DATABASE_ID
-        self.anthropic = Anthropic(api_key=Config.ANTHROPIC_API_KEY)
+
+    # SDK の import とクライアント生成は起動時間が大きいため、初回利用時まで遅延する
+    @cached_property
+    def client(self):
+        from notion_client import Client
+
+        return Client(auth=Config.NOTION_TOKEN, base_url=Config.NOTION_BASE_URL)
+
+    @cached_property
+    def anthropic(self):
+        from anthropic import Anthropic
+
+        # 再試行は _call_claude で行う（429/529 は共有リミッター、5xx と接続エラーはバックオフ）ため、SDK 側では無効にする
+        return Anthropic(
+            api_key=Config.ANTHROPIC_API_KEY,
+            base_url=Config.ANTHROPIC_BASE_URL or None,
+            max_retries=0,
+        )
+
+    @cached_property
+    def uploader(self):
+        from services.notion_uploader import NotionBlockUploader
+
+        return NotionBlockUploader(self.client)
+
+    @cached_property
+    def database_sync(self):
+        from services.notion_sync import NotionDatabaseSync
+
+        return NotionDatabaseSync(self.client, self.uploader)
+
+    def sync_models(
+        self,
+        popular_models: List[HuggingFaceModel],
+        trending_models: List[HuggingFaceModel],
+    ) -> dict:
+        """モデル別データベースのうち、前回から値が変わった行だけを更新"""
+        with metrics.span("notion_sync"):
+            counts = self.database_sync.sync(trending_models, popular_models)
+        for key, value in counts.items():
+            metrics.incr("notion", f"sync_{key}", value)
+        return counts
 
     def prepare_model_data(self, model: HuggingFaceModel) -> dict:
         """モデル情報を構造化データに変換"""
@@ -58,72 +122,35 @@ class NotionService:
             "private": model.private,
         }
 
+    @metrics.timed("news_script")
     def generate_news_script(
         self,
         trending_models: List[HuggingFaceModel],
         popular_models: List[HuggingFaceModel],
+        aggregates: Optional[dict] = None,
     ) -> str:
         """Claude APIを使用してニュース原稿を生成"""
-
-        def model_to_dict(model: HuggingFaceModel) -> dict:
-            """モデルをJSON変換可能な辞書形式に変換"""
-            return {
-                "id": model.id,
-                "name": model.id.split("/")[-1],
-                "author": model.author,
-                "description": model.description,
-                "downloads": model.stats.downloads,
-                "likes": model.stats.likes,
-                "recent_downloads": model.stats.recent_downloads,
-                "tags": model.tags,
-                "last_modified": (
-                    model.last_modified.isoformat()
-                    if isinstance(model.last_modified, datetime)
-                    else model.last_modified
-                ),
-                "trend_reasons": (
-                    [
-                        {"type": tr.type, "description": str(tr.description)}
-                        for tr in model.trend_reasons
-                    ]
-                    if model.trend_reasons
-                    else []
-                ),
-                "recent_commits": (
-                    [
-                        {
-                            "title": str(commit.title),
-                            "date": (
-                                commit.date.isoformat()
-                                if isinstance(commit.date, datetime)
-                                else str(commit.date)
-                            ),
-                            "description": (
-                                str(commit.description) if commit.description else None
-                            ),
-                        }
-                        for commit in model.recent_commits
-                    ]
-                    if model.recent_commits
-                    else []
-                ),
-            }
-
         try:
-            # モデルデータの構造化
-            data = {
-                "trending_models": [model_to_dict(m) for m in trending_models],
-                "popular_models": [model_to_dict(m) for m in popular_models],
-                "date": datetime.now().strftime("%Y-%m-%d"),
-            }
+            # モデル数が多い場合はセクションごとに要約してから原稿にまとめる
+            if use_map_reduce(trending_models, popular_models):
+                return self._generate_map_reduce(trending_models, popular_models, aggregates)
+
+            # モデルデータをトークン予算内に圧縮
+            payload = build_news_payload(trending_models, popular_models, aggregates=aggregates)
+            aggregates_note = (
+                "\n    aggregates には分野別（domains）・作者別（authors）・タグ別（tags）の集計表があり、"
+                "各行は columns の順（キー, モデル数, ダウンロード合計, いいね合計, 7日間のダウンロード増加）です。"
+                if aggregates
+                else ""
+            )
 
             # プロンプトの作成
             prompt = f"""以下のデータを基に、AIニュースキャスターが読み上げることを想定したトレンド分析のニュース原稿を作成してください。
-    データは、Hugging Faceの最新のモデルトレンドと累計人気モデルの情報です。
+    データは、Hugging Faceの最新のモデルトレンドと累計人気モデルの情報です。{aggregates_note}
 
     # データ
     ```json
-    {json.dumps(data, ensure_ascii=False, indent=2)}
+    {payload}
     ```
 
     以下の点を意識して原稿を作成してください：
@@ -136,22 +163,28 @@ class NotionService:
 
     なお、原稿は聞き手が理解しやすい、自然な話し言葉で作成してください。"""
 
+            # 同じ入力で生成済みの原稿があれば再利用
+            cache_key = ScriptCache.make_key(NEWS_SCRIPT_MODEL, prompt)
+            if self.script_cache:
+                cached = self.script_cache.get(cache_key)
+                if cached:
+                    print("キャッシュ済みのニュース原稿を使用します")
+                    metrics.incr("anthropic", "cache_hits")
+                    return cached
+                metrics.incr("anthropic", "cache_misses")
+
             # Claude APIを使用して生成
-            message = self.anthropic.messages.create(
-                model="claude-3-sonnet-20240229",
+            message = self._create_message(
+                model=NEWS_SCRIPT_MODEL,
                 max_tokens=1500,
                 temperature=0.7,
                 messages=[{"role": "user", "content": prompt}],
             )
-
-            # TextBlockからテキストを抽出
-            if message and hasattr(message.content, "text"):
-                return message.content.text
-            elif message and hasattr(message.content, "__iter__"):
-                # TextBlockのリストの場合、最初のブロックのテキストを取得
-                for block in message.content:
-                    if hasattr(block, "text"):
-                        return block.text
+            script = self._message_text(message)
+            if script:
+                if self.script_cache:
+                    self.script_cache.put(cache_key, script)
+                return script
 
             # デフォルトの応答
             return "ニュース原稿の生成に失敗しました。"
@@ -160,6 +193,211 @@ class NotionService:
             print(f"ニュース原稿生成でエラー発生: {str(e)}")
             return "申し訳ありません。ニュース原稿の生成中にエラーが発生しました。"
 
+    def _generate_map_reduce(
+        self,
+        trending_models: List[HuggingFaceModel],
+        popular_models: List[HuggingFaceModel],
+        aggregates: Optional[dict],
+    ) -> str:
+        """セクションごとの要約を並列にストリーミング生成し、短い reduce 呼び出しで原稿にまとめる
+
+        全体を NEWS_SCRIPT_TIME_BUDGET 秒に収めるため、map フェーズは持ち時間の一部で
+        打ち切り、間に合わなかったセクションは原稿に含めない。
+        """
+        started = time.monotonic()
+        budget = Config.NEWS_SCRIPT_TIME_BUDGET
+        sections = split_sections(trending_models, popular_models)
+        prompts = {section.title: section_prompt(section) for section in sections}
+        print(f"ニュース原稿を map-reduce で生成します（{len(sections)}セクション）")
+
+        cache_key = ScriptCache.make_key(NEWS_SCRIPT_MODEL, "map_reduce", *prompts.values(), repr(aggregates))
+        if self.script_cache:
+            cached = self.script_cache.get(cache_key)
+            if cached:
+                print("キャッシュ済みのニュース原稿を使用します")
+                metrics.incr("anthropic", "cache_hits")
+                return cached
+            metrics.incr("anthropic", "cache_misses")
+
+        # map: セクションごとの要約（期限を過ぎたセクションは待たない）
+        # 打ち切ったセクションがプロセスの終了を妨げないよう、デーモンスレッドで実行する
+        map_deadline = started + budget * MAP_PHASE_SHARE
+        slots = threading.BoundedSemaphore(Config.NEWS_SECTION_WORKERS)
+
+        def summarize(section):
+            with slots:
+                return self._stream_message(
+                    map_deadline,
+                    f"news_section:{section.name}",
+                    model=NEWS_SCRIPT_MODEL,
+                    max_tokens=SECTION_MAX_TOKENS,
+                    temperature=0.3,
+                    messages=[{"role": "user", "content": prompts[section.title]}],
+                )
+
+        futures = {run_in_daemon(summarize, section): section for section in sections}
+        with metrics.span("news_script_map"):
+            wait(futures, timeout=max(0.0, map_deadline - time.monotonic()))
+
+        summaries: Dict[str, str] = {}
+        complete = True
+        for future, section in futures.items():
+            if not future.done():
+                print(f"セクション「{section.title}」の要約が期限内に終わらなかったため省略します")
+                metrics.incr("anthropic", "sections_skipped")
+                complete = False
+                continue
+            try:
+                message = future.result()
+            except Exception as e:
+                print(f"セクション「{section.title}」の要約に失敗しました: {str(e)}")
+                metrics.incr("anthropic", "sections_failed")
+                complete = False
+                continue
+            text = self._message_text(message)
+            if text:
+                summaries[section.title] = text
+                complete = complete and not getattr(message, "truncated", False)
+        if not summaries:
+            return "ニュース原稿の生成に失敗しました。"
+
+        # reduce: 要約と集計表から原稿を生成（残り時間内で打ち切る）
+        with metrics.span("news_script_reduce"):
+            message = self._stream_message(
+                started + budget,
+                "news_reduce",
+                model=NEWS_SCRIPT_MODEL,
+                max_tokens=1500,
+                temperature=0.7,
+                messages=[{"role": "user", "content": reduce_prompt(summaries, aggregates)}],
+            )
+        script = self._message_text(message)
+        if not script:
+            return "ニュース原稿の生成に失敗しました。"
+        # 途中で打ち切った原稿はキャッシュしない
+        if self.script_cache and complete and not getattr(message, "truncated", False):
+            self.script_cache.put(cache_key, script)
+        return script
+
+    @staticmethod
+    def _message_text(message) -> Optional[str]:
+        """応答の TextBlock からテキストを抽出し、トークン使用量を記録"""
+        usage = getattr(message, "usage", None)
+        if usage:
+            metrics.incr("anthropic", "input_tokens", getattr(usage, "input_tokens", 0) or 0)
+            metrics.incr("anthropic", "output_tokens", getattr(usage, "output_tokens", 0) or 0)
+
+        if message and hasattr(message.content, "text"):
+            return message.content.text
+        if message and hasattr(message.content, "__iter__"):
+            # TextBlockのリストの場合、最初のブロックのテキストを取得
+            for block in message.content:
+                if hasattr(block, "text"):
+                    return block.text
+        return None
+
+    def _create_message(self, **kwargs):
+        """共有レートリミッターを通して Claude API を呼び出す（429/529 は待機して再試行）"""
+        return self._call_claude(lambda: self.anthropic.messages.create(**kwargs), kwargs)
+
+    def _stream_message(self, deadline: float, label: str, **kwargs):
+        """ストリーミングで Claude API を呼び出し、deadline（time.monotonic）で打ち切る
+
+        打ち切った場合はそこまでのテキストを truncated=True の応答として返す。
+        """
+        call_deadline = min(time.monotonic() + Config.NEWS_SCRIPT_CALL_TIMEOUT, deadline)
+
+        def send():
+            timeout = call_deadline - time.monotonic()
+            if timeout <= 0:
+                raise TimeoutError(f"{label} の期限を過ぎました")
+            chunks = []
+            with self.anthropic.messages.stream(timeout=timeout, **kwargs) as stream:
+                for text in stream.text_stream:
+                    chunks.append(text)
+                    if time.monotonic() >= call_deadline:
+                        metrics.incr("anthropic", "stream_truncated")
+                        return {
+                            "content": [{"type": "text", "text": "".join(chunks)}],
+                            "stop_reason": "deadline",
+                            "truncated": True,
+                        }
+                final = stream.get_final_message()
+            return {
+                "content": [{"type": "text", "text": "".join(chunks)}],
+                "stop_reason": final.stop_reason,
+                "usage": {
+                    "input_tokens": final.usage.input_tokens,
+                    "output_tokens": final.usage.output_tokens,
+                },
+                "truncated": False,
+            }
+
+        message = self._call_claude(send, kwargs, label, deadline=call_deadline)
+        if isinstance(message, dict):
+            message = SimpleNamespace(
+                content=[SimpleNamespace(**block) for block in message["content"]],
+                stop_reason=message["stop_reason"],
+                usage=SimpleNamespace(**message["usage"]) if "usage" in message else None,
+                truncated=message["truncated"],
+            )
+        return message
+
+    def _call_claude(
+        self, send, kwargs: dict, label: Optional[str] = None, deadline: Optional[float] = None
+    ):
+        """send() を共有リミッター・記録/再生・メトリクスを通して実行
+
+        429/529 はリミッターで待機して再試行し、5xx・接続エラー・タイムアウトは
+        HTTP_RETRIES 回まで指数バックオフで再試行する（deadline を過ぎる場合は再試行しない）。
+        """
+        if self.archive and self.archive.replaying:
+            metrics.incr("anthropic", "replayed")
+            return self.archive.replay_message(kwargs, label)
+
+        from anthropic import APIConnectionError
+
+        limiter = get_rate_limiter().for_url(Config.ANTHROPIC_BASE_URL or ANTHROPIC_API_URL)
+        throttled = errors = 0
+        while True:
+            limiter.acquire()
+            metrics.incr("anthropic", "api_calls")
+            try:
+                message = send()
+            except Exception as e:
+                status = getattr(e, "status_code", None)
+                if status in ANTHROPIC_THROTTLE_STATUSES:
+                    metrics.incr("anthropic", "rate_limited")
+                    response = getattr(e, "response", None)
+                    retry_after = parse_retry_after(response.headers.get("retry-after")) if response is not None else None
+                    wait = limiter.release("throttled", retry_after)
+                    throttled += 1
+                    if throttled > Config.RATE_LIMIT_RETRIES:
+                        raise
+                    print(f"Claude API のレート制限に到達しました。{wait:.1f}秒待機します")
+                    continue
+
+                limiter.release("error")
+                transient = isinstance(e, APIConnectionError) or (
+                    status is not None and (status >= 500 or status in ANTHROPIC_TRANSIENT_STATUSES)
+                )
+                wait = Config.HTTP_BACKOFF_FACTOR * (2 ** errors)
+                errors += 1
+                if (
+                    not transient
+                    or errors > Config.HTTP_RETRIES
+                    or (deadline is not None and time.monotonic() + wait >= deadline)
+                ):
+                    raise
+                metrics.incr("anthropic", "retries")
+                print(f"Claude API の呼び出しに失敗しました（{str(e)}）。{wait:.1f}秒後に再試行します")
+                time.sleep(wait)
+                continue
+            limiter.release("ok")
+            if self.archive and self.archive.recording:
+                self.archive.record_message(kwargs, message, label)
+            return message
+
     def create_model_blocks(
         self, model: HuggingFaceModel, idx: int, is_trending: bool = False
     ) -> List[dict]:
@@ -303,19 +541,137 @@ class NotionService:
 
         return blocks
 
+    @metrics.timed("block_build")
+    def build_report_blocks(
+        self,
+        popular_models: List[HuggingFaceModel],
+        trending_models: List[HuggingFaceModel],
+    ) -> List[dict]:
+        """レポートページのブロックを作成（ニュース原稿はプレースホルダー）"""
+        content_blocks = []
+
+        # ニュースキャスター原稿セクション
+        content_blocks.extend(
+            [
+                {
+                    "object": "block",
+                    "type": "heading_1",
+                    "heading_1": {
+                        "rich_text": [
+                            {
+                                "type": "text",
+                                "text": {"content": "📰 AIニュースキャスター原稿"},
+                            }
+                        ]
+                    },
+                },
+                self._news_script_block(NEWS_SCRIPT_PLACEHOLDER),
+                {"object": "block", "type": "divider", "divider": {}},
+            ]
+        )
+
+        # トレンドモデルセクション
+        content_blocks.extend(
+            [
+                {
+                    "object": "block",
+                    "type": "heading_1",
+                    "heading_1": {
+                        "rich_text": [
+                            {
+                                "type": "text",
+                                "text": {"content": "🔥 Real-Time Trending Models"},
+                            }
+                        ]
+                    },
+                },
+                {
+                    "object": "block",
+                    "type": "paragraph",
+                    "paragraph": {
+                        "rich_text": [
+                            {
+                                "type": "text",
+                                "text": {
+                                    "content": "現在注目を集めているモデル\n\n"
+                                },
+                            }
+                        ]
+                    },
+                },
+            ]
+        )
+
+        # トレンドモデルの情報を追加
+        for idx, model in enumerate(trending_models, 1):
+            content_blocks.extend(
+                self.create_model_blocks(model, idx, is_trending=True)
+            )
+
+        # セパレータ
+        content_blocks.append({"object": "block", "type": "divider", "divider": {}})
+
+        # 人気モデルセクション
+        content_blocks.extend(
+            [
+                {
+                    "object": "block",
+                    "type": "heading_1",
+                    "heading_1": {
+                        "rich_text": [
+                            {
+                                "type": "text",
+                                "text": {"content": "🌟 Most Downloaded Models"},
+                            }
+                        ]
+                    },
+                },
+                {
+                    "object": "block",
+                    "type": "paragraph",
+                    "paragraph": {
+                        "rich_text": [
+                            {
+                                "type": "text",
+                                "text": {
+                                    "content": "累計ダウンロード数の多いモデル\n\n"
+                                },
+                            }
+                        ]
+                    },
+                },
+            ]
+        )
+
+        # 人気モデルの情報を追加
+        for idx, model in enumerate(popular_models, 1):
+            content_blocks.extend(self.create_model_blocks(model, idx))
+
+        return content_blocks
+
     def create_page(
         self,
         popular_models: List[HuggingFaceModel],
         trending_models: List[HuggingFaceModel],
+        script_deadline: Optional[float] = None,
+        aggregates: Optional[dict] = None,
     ):
-        """Notionページを作成"""
+        """Notionページを作成
+
+        ニュース原稿の生成とページ作成を並行して行う。script_deadline（秒）を指定すると、
+        ページ作成後その時間内に原稿が生成されなければ原稿なしで公開する。
+        """
+        deadline = script_deadline or Config.NEWS_SCRIPT_DEADLINE or None
         today = datetime.now().strftime("%Y-%m-%d")
         print(f"Notionページ作成開始: {today}")
 
-        try:
-            # ニュース原稿を生成
-            news_script = self.generate_news_script(trending_models, popular_models)
+        # ニュース原稿の生成はバックグラウンドで行い、その間にページを作成する
+        # （期限切れで公開した場合にプロセスの終了を妨げないよう、デーモンスレッドで実行する）
+        script_future = run_in_daemon(
+            self.generate_news_script, trending_models, popular_models, aggregates
+        )
 
+        try:
             page_properties = {
                 "title": {
                     "title": [{"text": {"content": f"HF Models Report - {today}"}}]
@@ -324,121 +680,20 @@ class NotionService:
                 "Tags": {"multi_select": [{"name": "キャッチアップ"}]},
             }
 
-            content_blocks = []
+            content_blocks = self.build_report_blocks(popular_models, trending_models)
 
-            # ニュースキャスター原稿セクション
-            content_blocks.extend(
-                [
-                    {
-                        "object": "block",
-                        "type": "heading_1",
-                        "heading_1": {
-                            "rich_text": [
-                                {
-                                    "type": "text",
-                                    "text": {"content": "📰 AIニュースキャスター原稿"},
-                                }
-                            ]
-                        },
-                    },
-                    {
-                        "object": "block",
-                        "type": "callout",
-                        "callout": {
-                            "rich_text": [
-                                {"type": "text", "text": {"content": news_script}}
-                            ],
-                            "icon": {"emoji": "🎤"},
-                        },
-                    },
-                    {"object": "block", "type": "divider", "divider": {}},
-                ]
-            )
-
-            # トレンドモデルセクション
-            content_blocks.extend(
-                [
-                    {
-                        "object": "block",
-                        "type": "heading_1",
-                        "heading_1": {
-                            "rich_text": [
-                                {
-                                    "type": "text",
-                                    "text": {"content": "🔥 Real-Time Trending Models"},
-                                }
-                            ]
-                        },
-                    },
-                    {
-                        "object": "block",
-                        "type": "paragraph",
-                        "paragraph": {
-                            "rich_text": [
-                                {
-                                    "type": "text",
-                                    "text": {
-                                        "content": "現在注目を集めているモデル\n\n"
-                                    },
-                                }
-                            ]
-                        },
-                    },
-                ]
-            )
-
-            # トレンドモデルの情報を追加
-            for idx, model in enumerate(trending_models, 1):
-                content_blocks.extend(
-                    self.create_model_blocks(model, idx, is_trending=True)
+            # 100ブロックを超える分は blocks.children.append で追記される
+            with metrics.span("notion_upload"):
+                page = self.uploader.create_page(
+                    parent={"database_id": self.database_id},
+                    properties=page_properties,
+                    blocks=content_blocks,
                 )
 
-            # セパレータ
-            content_blocks.append({"object": "block", "type": "divider", "divider": {}})
-
-            # 人気モデルセクション
-            content_blocks.extend(
-                [
-                    {
-                        "object": "block",
-                        "type": "heading_1",
-                        "heading_1": {
-                            "rich_text": [
-                                {
-                                    "type": "text",
-                                    "text": {"content": "🌟 Most Downloaded Models"},
-                                }
-                            ]
-                        },
-                    },
-                    {
-                        "object": "block",
-                        "type": "paragraph",
-                        "paragraph": {
-                            "rich_text": [
-                                {
-                                    "type": "text",
-                                    "text": {
-                                        "content": "累計ダウンロード数の多いモデル\n\n"
-                                    },
-                                }
-                            ]
-                        },
-                    },
-                ]
-            )
-
-            # 人気モデルの情報を追加
-            for idx, model in enumerate(popular_models, 1):
-                content_blocks.extend(self.create_model_blocks(model, idx))
-
-            page = self.client.pages.create(
-                parent={"database_id": self.database_id},
-                properties=page_properties,
-                children=content_blocks,
-            )
-
             page_id = page["id"]
+            with metrics.span("news_script_fill"):
+                self._fill_news_script(page_id, script_future, deadline)
+
             page_url = f"https://notion.so/{page_id.replace('-', '')}"
             print(f"Notionページを作成しました: {page_url}")
             return page
@@ -446,3 +701,37 @@ class NotionService:
         except Exception as e:
             print(f"ページ作成でエラー発生: {str(e)}")
             raise
+
+    @staticmethod
+    def _news_script_block(text: str) -> dict:
+        return {
+            "object": "block",
+            "type": "callout",
+            "callout": {
+                "rich_text": [{"type": "text", "text": {"content": text}}],
+                "icon": {"emoji": "🎤"},
+            },
+        }
+
+    def _fill_news_script(
+        self, page_id: str, script_future, deadline: Optional[float]
+    ) -> None:
+        """生成完了後にプレースホルダーのコールアウトを原稿で置き換える"""
+        try:
+            news_script = script_future.result(timeout=deadline)
+        except FutureTimeoutError:
+            print(f"ニュース原稿が期限（{deadline}秒）内に生成されなかったため、原稿なしで公開します")
+            news_script = NEWS_SCRIPT_TIMEOUT_MESSAGE
+
+        # 先頭の見出しの直後にあるコールアウトがプレースホルダー
+        children = self.uploader.call(
+            self.client.blocks.children.list, block_id=page_id, page_size=3
+        )
+        placeholder_id = next(
+            block["id"] for block in children["results"] if block["type"] == "callout"
+        )
+        self.uploader.call(
+            self.client.blocks.update,
+            block_id=placeholder_id,
+            callout=self._news_script_block(news_script)["callout"],
+        )
@@ -0,0 +1,256 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+from models.huggingface import HuggingFaceModel
+from services.concurrency import ordered_map
+
+# 同期先データベースのプロパティ名（Notion 側で同名・同型のプロパティを用意しておく）
+PROP_NAME = "Name"  # title
+PROP_AUTHOR = "Author"  # rich_text
+PROP_DOWNLOADS = "Downloads"  # number
+PROP_LIKES = "Likes"  # number
+PROP_TAGS = "Tags"  # multi_select
+PROP_LAST_MODIFIED = "Last Modified"  # date
+PROP_TREND_REASONS = "Trend Reasons"  # rich_text
+PROP_LISTS = "Lists"  # multi_select（Trending / Popular）
+
+MAX_TAGS = 25
+MAX_TEXT_LENGTH = 2000  # rich_text 1要素あたりの上限
+
+
+def _date_only(value) -> Optional[str]:
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    return str(value)[:10] or None
+
+
+def _tag_name(tag: str) -> str:
+    # multi_select の選択肢名にカンマは使えない
+    return tag.replace(",", " ")[:100]
+
+
+def row_values(model: HuggingFaceModel, lists: Iterable[str]) -> dict:
+    """モデル1件を同期対象の値に正規化（差分判定にも使う）"""
+    tags = list(dict.fromkeys(_tag_name(tag) for tag in model.tags))[:MAX_TAGS]
+    reasons = "\n".join(reason.description for reason in model.trend_reasons or [])
+    return {
+        "author": model.author or "",
+        "downloads": model.stats.downloads,
+        "likes": model.stats.likes,
+        "tags": tags,
+        "last_modified": _date_only(model.last_modified),
+        "trend_reasons": reasons[:MAX_TEXT_LENGTH],
+        "lists": sorted(set(lists)),
+    }
+
+
+def row_hash(values: dict) -> str:
+    """Lists 以外の値のハッシュ（Lists は状態に別途保持し、単独で更新できるようにする）"""
+    content = {key: value for key, value in values.items() if key != "lists"}
+    return hashlib.sha256(
+        json.dumps(content, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+def _text(value: str) -> List[dict]:
+    return [{"type": "text", "text": {"content": value}}] if value else []
+
+
+def _plain_text(prop: dict, kind: str) -> str:
+    return "".join(part.get("plain_text", "") for part in prop.get(kind) or [])
+
+
+def notion_properties(model_id: str, values: dict) -> dict:
+    """正規化した値を Notion のページプロパティに変換"""
+    return {
+        PROP_NAME: {"title": _text(model_id)},
+        PROP_AUTHOR: {"rich_text": _text(values["author"])},
+        PROP_DOWNLOADS: {"number": values["downloads"]},
+        PROP_LIKES: {"number": values["likes"]},
+        PROP_TAGS: {"multi_select": [{"name": tag} for tag in values["tags"]]},
+        PROP_LAST_MODIFIED: {
+            "date": {"start": values["last_modified"]} if values["last_modified"] else None
+        },
+        PROP_TREND_REASONS: {"rich_text": _text(values["trend_reasons"])},
+        PROP_LISTS: {"multi_select": [{"name": name} for name in values["lists"]]},
+    }
+
+
+def values_from_page(page: dict) -> Tuple[str, dict]:
+    """databases.query の結果1件から (モデル ID, 正規化した値) を復元"""
+    props = page.get("properties", {})
+    date = (props.get(PROP_LAST_MODIFIED, {}).get("date") or {}).get("start")
+    values = {
+        "author": _plain_text(props.get(PROP_AUTHOR, {}), "rich_text"),
+        "downloads": props.get(PROP_DOWNLOADS, {}).get("number"),
+        "likes": props.get(PROP_LIKES, {}).get("number"),
+        "tags": [opt["name"] for opt in props.get(PROP_TAGS, {}).get("multi_select") or []],
+        "last_modified": date[:10] if date else None,
+        "trend_reasons": _plain_text(props.get(PROP_TREND_REASONS, {}), "rich_text"),
+        "lists": sorted(opt["name"] for opt in props.get(PROP_LISTS, {}).get("multi_select") or []),
+    }
+    return _plain_text(props.get(PROP_NAME, {}), "title"), values
+
+
+class NotionDatabaseSync:
+    """モデルごとに1行を持つ Notion データベースへ、変更のあった行だけを反映する
+
+    行ごとのページ ID とプロパティのハッシュ・所属リストを状態ファイルに保存し、次回は
+    変わった行だけを pages.update / pages.create する。今回どちらのリストにも入らなかった
+    行は Lists だけを空に更新する。状態ファイルが無い場合は databases.query で既存の行を
+    読み込んで状態を復元する。
+    """
+
+    def __init__(
+        self,
+        client,
+        uploader,
+        database_id: Optional[str] = None,
+        state_path: Optional[str] = None,
+        workers: Optional[int] = None,
+    ):
+        self.client = client
+        self.uploader = uploader
+        self.database_id = database_id or Config.NOTION_SYNC_DATABASE_ID
+        self.state_path = Path(state_path or Config.NOTION_SYNC_STATE)
+        self.workers = workers or Config.NOTION_SYNC_WORKERS
+        self._lock = threading.Lock()
+
+    def sync(
+        self,
+        trending_models: List[HuggingFaceModel],
+        popular_models: List[HuggingFaceModel],
+    ) -> Dict[str, int]:
+        """変更のあった行だけを作成・更新し、件数を返す"""
+        rows = self._collect_rows(trending_models, popular_models)
+        state = self._load_state()
+        if state is None:
+            state = self._bootstrap()
+
+        changes = []
+        for model_id, values in rows.items():
+            digest = row_hash(values)
+            known = state.get(model_id)
+            if not known or known["hash"] != digest or known.get("lists") != values["lists"]:
+                changes.append((model_id, values, digest, known and known["page_id"]))
+        # 今回のリストから外れた行（所属リストが不明な古い状態も含む）
+        stale = [
+            (model_id, known["page_id"])
+            for model_id, known in state.items()
+            if model_id not in rows and known.get("lists") != []
+        ]
+
+        results = ordered_map(lambda change: self._push(state, *change), changes, self.workers)
+        cleared = ordered_map(lambda row: self._clear_lists(state, *row), stale, self.workers)
+        self._save_state(state)
+
+        counts = {
+            "created": sum(1 for result in results if result == "created"),
+            "updated": sum(1 for result in results if result == "updated"),
+            "cleared": sum(1 for result in cleared if result),
+            "failed": sum(1 for result in [*results, *cleared] if not result),
+            "unchanged": len(rows) - len(changes),
+        }
+        print(
+            "Notionデータベースを同期しました: "
+            f"作成 {counts['created']}件 / 更新 {counts['updated']}件 / "
+            f"リスト外 {counts['cleared']}件 / "
+            f"変更なし {counts['unchanged']}件 / 失敗 {counts['failed']}件"
+        )
+        return counts
+
+    @staticmethod
+    def _collect_rows(
+        trending_models: List[HuggingFaceModel], popular_models: List[HuggingFaceModel]
+    ) -> Dict[str, dict]:
+        # 両方のリストに含まれるモデルは1行にまとめる
+        models: Dict[str, HuggingFaceModel] = {}
+        lists: Dict[str, set] = {}
+        for name, group in (("Trending", trending_models), ("Popular", popular_models)):
+            for model in group:
+                models.setdefault(model.id, model)
+                lists.setdefault(model.id, set()).add(name)
+        return {model_id: row_values(model, lists[model_id]) for model_id, model in models.items()}
+
+    def _push(self, state: dict, model_id: str, values: dict, digest: str, page_id: Optional[str]):
+        properties = notion_properties(model_id, values)
+        try:
+            if page_id:
+                self.uploader.call(self.client.pages.update, page_id=page_id, properties=properties)
+                result = "updated"
+            else:
+                page = self.uploader.call(
+                    self.client.pages.create,
+                    parent={"database_id": self.database_id},
+                    properties=properties,
+                )
+                page_id = page["id"]
+                result = "created"
+        except Exception as e:
+            print(f"Notionの行の同期に失敗しました ({model_id}): {str(e)}")
+            return None
+
+        with self._lock:
+            state[model_id] = {"page_id": page_id, "hash": digest, "lists": values["lists"]}
+        return result
+
+    def _clear_lists(self, state: dict, model_id: str, page_id: str) -> bool:
+        """リストから外れた行の Lists だけを空にする（他の値は前回のまま残す）"""
+        try:
+            self.uploader.call(
+                self.client.pages.update,
+                page_id=page_id,
+                properties={PROP_LISTS: {"multi_select": []}},
+            )
+        except Exception as e:
+            print(f"Notionの行の同期に失敗しました ({model_id}): {str(e)}")
+            return False
+
+        with self._lock:
+            state[model_id] = {**state[model_id], "lists": []}
+        return True
+
+    def _bootstrap(self) -> dict:
+        """既存の行を databases.query で読み込み、状態を復元"""
+        print("同期状態が無いため、Notionデータベースから既存の行を読み込みます")
+        state = {}
+        cursor = None
+        while True:
+            kwargs = {"database_id": self.database_id, "page_size": 100}
+            if cursor:
+                kwargs["start_cursor"] = cursor
+            response = self.uploader.call(self.client.databases.query, **kwargs)
+            for page in response.get("results", []):
+                model_id, values = values_from_page(page)
+                if model_id:
+                    state[model_id] = {
+                        "page_id": page["id"],
+                        "hash": row_hash(values),
+                        "lists": values["lists"],
+                    }
+            if not response.get("has_more"):
+                return state
+            cursor = response.get("next_cursor")
+
+    def _load_state(self) -> Optional[dict]:
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("database_id") != self.database_id:
+            return None
+        return data.get("rows", {})
+
+    def _save_state(self, state: dict) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_name(f"{self.state_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"database_id": self.database_id, "rows": state}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
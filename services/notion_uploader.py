@@ -0,0 +1,98 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from notion_client import APIResponseError
+
+from config import Config
+from instrumentation import metrics
+from services.rate_limit import NOTION_API_URL, HostLimiter, get_rate_limiter, parse_retry_after
+
+# Notion API が1リクエストで受け付ける子ブロック数の上限
+MAX_BLOCKS_PER_REQUEST = 100
+
+
+class NotionBlockUploader:
+    """ブロックを100件単位に分割し、レート制限を守りながらページを作成する"""
+
+    def __init__(
+        self,
+        client,
+        rate: Optional[float] = None,
+        chunk_size: int = MAX_BLOCKS_PER_REQUEST,
+        max_retries: Optional[int] = None,
+        limiter: Optional[HostLimiter] = None,
+    ):
+        self.client = client
+        # rate を指定しない場合は他のサービスと共有する Notion ホストのリミッターを使う
+        if limiter is None:
+            limiter = (
+                HostLimiter(rate)
+                if rate
+                else get_rate_limiter().for_url(Config.NOTION_BASE_URL or NOTION_API_URL)
+            )
+        self.limiter = limiter
+        self.chunk_size = min(chunk_size, MAX_BLOCKS_PER_REQUEST)
+        self.max_retries = Config.RATE_LIMIT_RETRIES if max_retries is None else max_retries
+
+    def create_page(self, parent: dict, properties: dict, blocks: Iterable[dict]) -> dict:
+        """最初のチャンクでページを作成し、残りを順番に追記する"""
+        batches = self._batches(blocks)
+        page = self.call(
+            self.client.pages.create,
+            parent=parent,
+            properties=properties,
+            children=next(batches, []),
+        )
+        self.append_blocks(page["id"], batches)
+        return page
+
+    def append_blocks(self, block_id: str, batches: Iterator[List[dict]]) -> None:
+        """送信中のバッチを待つ間に次のバッチを準備して順に追記"""
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            in_flight = None
+            for batch in batches:
+                if in_flight:
+                    in_flight.result()
+                in_flight = executor.submit(
+                    self.call,
+                    self.client.blocks.children.append,
+                    block_id=block_id,
+                    children=batch,
+                )
+            if in_flight:
+                in_flight.result()
+
+    def _batches(self, blocks: Iterable[dict]) -> Iterator[List[dict]]:
+        iterator = iter(blocks)
+        while True:
+            batch = list(islice(iterator, self.chunk_size))
+            if not batch:
+                return
+            yield batch
+
+    def call(self, func: Callable, **kwargs):
+        """トークンを取得して API を呼び出し、429 の場合は Retry-After に従って再試行"""
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            metrics.incr("notion", "api_calls")
+            try:
+                result = func(**kwargs)
+            except APIResponseError as e:
+                metrics.incr("notion", "api_errors")
+                if e.status != 429:
+                    self.limiter.release("error")
+                    raise
+                metrics.incr("notion", "rate_limited")
+                headers = getattr(e, "headers", None) or {}
+                wait = self.limiter.release("throttled", parse_retry_after(headers.get("Retry-After")))
+                if attempt >= self.max_retries:
+                    raise
+                print(f"Notion API のレート制限に到達しました。{wait:.1f}秒待機します")
+                continue
+            except BaseException:
+                self.limiter.release("error")
+                raise
+            self.limiter.release("ok")
+            return result
+        raise RuntimeError("unreachable")
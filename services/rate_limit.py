@@ -0,0 +1,180 @@
+import email.utils
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from config import Config
+
+NOTION_API_URL = "https://api.notion.com"
+ANTHROPIC_API_URL = "https://api.anthropic.com"
+
+
+class TokenBucket:
+    """一定レートでトークンを補充するシンプルなトークンバケット（rate が 0 以下なら無制限）"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """トークンを1つ取得できるまで待機"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if self.rate <= 0:
+                    if now >= self._blocked_until:
+                        return
+                    wait = self._blocked_until - now
+                else:
+                    self._tokens = min(
+                        self.capacity, self._tokens + (now - self._updated) * self.rate
+                    )
+                    self._updated = now
+                    if now >= self._blocked_until and self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = max(self._blocked_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Retry-After などで指定された時間だけ払い出しを止める"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Retry-After ヘッダー（秒数または HTTP 日付）を待機秒数に変換"""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class HostLimiter:
+    """ホスト単位のトークンバケットと AIMD による同時実行数の調整
+
+    成功するたびに同時実行数を少しずつ増やし（加算増加）、429 を受けたら半減させて
+    Retry-After の間はリクエストの払い出しを止める（乗算減少）。
+    """
+
+    # 同時に返ってきた 429 で何度も半減しないよう、減少の間隔を空ける
+    DECREASE_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        rate: float = 0,
+        max_concurrency: Optional[int] = None,
+        initial_concurrency: Optional[int] = None,
+        min_concurrency: int = 1,
+        max_backoff: float = 60.0,
+    ):
+        self.bucket = TokenBucket(rate)
+        self.max_concurrency = max_concurrency or Config.RATE_LIMIT_MAX_CONCURRENCY
+        self.min_concurrency = min_concurrency
+        self.max_backoff = max_backoff
+        self.limit = float(
+            min(self.max_concurrency, initial_concurrency or Config.RATE_LIMIT_INITIAL_CONCURRENCY)
+        )
+        self.in_flight = 0
+        self._throttle_streak = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    @property
+    def concurrency(self) -> int:
+        return max(self.min_concurrency, int(self.limit))
+
+    def acquire(self) -> None:
+        """同時実行枠とトークンを取得できるまで待機"""
+        with self._cond:
+            while self.in_flight >= self.concurrency:
+                self._cond.wait()
+            self.in_flight += 1
+        try:
+            self.bucket.acquire()
+        except BaseException:
+            self.release("error")
+            raise
+
+    def release(self, outcome: str = "ok", retry_after: Optional[float] = None) -> float:
+        """枠を返却して結果を反映（outcome: ok / throttled / error）
+
+        throttled の場合は払い出しを止めた秒数を返す。
+        """
+        wait = 0.0
+        with self._cond:
+            self.in_flight -= 1
+            if outcome == "ok":
+                self._throttle_streak = 0
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            elif outcome == "throttled":
+                self._throttle_streak += 1
+                now = time.monotonic()
+                if now - self._last_decrease >= self.DECREASE_INTERVAL:
+                    self.limit = max(self.min_concurrency, self.limit / 2)
+                    self._last_decrease = now
+                wait = (
+                    retry_after
+                    if retry_after is not None
+                    else min(self.max_backoff, 2 ** (self._throttle_streak - 1))
+                )
+            self._cond.notify_all()
+        if wait:
+            self.bucket.pause(wait)
+        return wait
+
+
+class RateLimiter:
+    """全サービスで共有するホストごとの HostLimiter の登録簿"""
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None, scale: float = 1.0):
+        self.rates = default_rates() if rates is None else rates
+        self.scale = scale
+        self._limiters: Dict[str, HostLimiter] = {}
+        self._lock = threading.Lock()
+
+    def for_host(self, host: str) -> HostLimiter:
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                rate = self.rates.get(host, 0) * self.scale
+                limiter = self._limiters[host] = HostLimiter(rate)
+            return limiter
+
+    def for_url(self, url: str) -> HostLimiter:
+        return self.for_host(urlparse(url).netloc)
+
+
+def default_rates() -> Dict[str, float]:
+    """設定値からホストごとの毎秒リクエスト数を組み立てる（0 はレート制限なし）"""
+    return {
+        urlparse(Config.HF_BASE_URL).netloc: Config.HF_RATE_LIMIT,
+        urlparse(Config.NOTION_BASE_URL or NOTION_API_URL).netloc: Config.NOTION_RATE_LIMIT,
+        urlparse(Config.ANTHROPIC_BASE_URL or ANTHROPIC_API_URL).netloc: Config.ANTHROPIC_RATE_LIMIT,
+    }
+
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """プロセス内で共有する RateLimiter を取得"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+        return _shared_limiter
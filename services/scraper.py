@@ -1,46 +1,48 @@
+import html
+import json
+import re
 from typing import Dict, List, Optional
 
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 from config import Config
+from instrumentation import metrics
+from services.http import HttpClient, get_http_client
+
+# トレンドページに埋め込まれたモデル一覧の props（SVELTE_HYDRATER の data-props 属性）
+_MODEL_LIST_PROPS_RE = re.compile(
+    r'data-target="ModelList"[^>]*?data-props="([^"]*)"'
+    r'|data-props="([^"]*)"[^>]*?data-target="ModelList"'
+)
+
+
+
+def _is_card_class(value: Optional[str]) -> bool:
+    return bool(value) and "overview-card-wrapper" in value.split()
 
 
 class HuggingFaceScraper:
-    def __init__(self):
-        self.headers = {
-            "Accept": "application/json",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-        }
+    def __init__(
+        self, http: Optional[HttpClient] = None, parse_mode: Optional[str] = None
+    ):
+        self.http = http or get_http_client()
+        self.parse_mode = parse_mode or Config.SCRAPER_PARSE_MODE
 
+    @metrics.timed("scrape")
     def get_trending_models_data(self) -> List[Dict]:
         """トレンドページからモデル情報を取得"""
         print("トレンドモデルのスクレイピングを開始...")
 
         try:
-            response = requests.get(
-                f"{Config.HF_BASE_URL}/models?sort=trending",
-                headers=self.headers,
-                timeout=30,
+            response = self.http.get(
+                f"{Config.HF_BASE_URL}/models?sort=trending", timeout=30, service="scraper"
             )
 
             if response.status_code != 200:
                 print(f"ページの取得に失敗: {response.status_code}")
                 return []
 
-            soup = BeautifulSoup(response.text, "html.parser")
-            model_cards = soup.find_all("article", class_="overview-card-wrapper")
-            trend_data = []
-
-            for card in model_cards[: Config.MODEL_LIMIT]:
-                try:
-                    data = self._extract_card_data(card)
-                    if data:
-                        trend_data.append(data)
-                except Exception as e:
-                    print(f"カードの解析中にエラー: {str(e)}")
-                    continue
-
+            trend_data = self.parse_trending_page(response.text)
             print(f"{len(trend_data)}件のトレンドモデルを取得しました")
             return trend_data
 
@@ -48,6 +50,68 @@ class HuggingFaceScraper:
             print(f"スクレイピング中にエラー: {str(e)}")
             return []
 
+    def parse_trending_page(self, page_html: str) -> List[Dict]:
+        """トレンドページの HTML からモデル情報を抽出"""
+        if self.parse_mode == "fast":
+            # ページに埋め込まれた JSON を優先し、無ければカード要素だけをパースする
+            trend_data = self._parse_embedded_props(page_html)
+            if trend_data is not None:
+                return trend_data
+            return self._parse_cards(page_html, restricted=True)
+        return self._parse_cards(page_html, restricted=False)
+
+    def _parse_embedded_props(self, page_html: str) -> Optional[List[Dict]]:
+        """埋め込み props の JSON からモデル情報を抽出（見つからなければ None）"""
+        match = _MODEL_LIST_PROPS_RE.search(page_html)
+        if not match:
+            return None
+
+        try:
+            props = json.loads(html.unescape(match.group(1) or match.group(2)))
+            models = props["initialValues"]["models"]
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"埋め込みデータの解析に失敗: {str(e)}")
+            return None
+
+        trend_data = []
+        for model in models[: Config.MODEL_LIMIT]:
+            if not model.get("id"):
+                continue
+            downloads = model.get("downloads")
+            trend_data.append(
+                {
+                    "model_id": model["id"],
+                    "recent_downloads": (
+                        f"{downloads:,} downloads" if downloads is not None else None
+                    ),
+                    "card_description": None,
+                }
+            )
+        return trend_data
+
+    def _parse_cards(self, page_html: str, restricted: bool) -> List[Dict]:
+        """モデルカード要素からモデル情報を抽出"""
+        if restricted:
+            # カード要素以外はツリーを構築しない（パース時点の class は分割前の文字列）
+            only_cards = SoupStrainer("article", class_=_is_card_class)
+            soup = BeautifulSoup(page_html, "html.parser", parse_only=only_cards)
+        else:
+            soup = BeautifulSoup(page_html, "html.parser")
+
+        model_cards = soup.find_all("article", class_="overview-card-wrapper")
+        trend_data = []
+
+        for card in model_cards[: Config.MODEL_LIMIT]:
+            try:
+                data = self._extract_card_data(card)
+                if data:
+                    trend_data.append(data)
+            except Exception as e:
+                print(f"カードの解析中にエラー: {str(e)}")
+                continue
+
+        return trend_data
+
     def _extract_card_data(self, card) -> Optional[Dict]:
         """モデルカードから情報を抽出"""
         model_link = card.find("a", href=True)
@@ -0,0 +1,295 @@
+import json
+import sqlite3
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config import Config
+from models.huggingface import HuggingFaceModel, ModelCommit
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS model_snapshots (
+    model_id TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    author TEXT,
+    downloads INTEGER NOT NULL DEFAULT 0,
+    likes INTEGER NOT NULL DEFAULT 0,
+    tags TEXT NOT NULL DEFAULT '[]',
+    last_modified TEXT,
+    private INTEGER NOT NULL DEFAULT 0,
+    commits_fetched INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (model_id, run_date)
+);
+CREATE INDEX IF NOT EXISTS idx_model_snapshots_model_id ON model_snapshots (model_id);
+CREATE INDEX IF NOT EXISTS idx_model_snapshots_run_date ON model_snapshots (run_date);
+
+CREATE TABLE IF NOT EXISTS model_commits (
+    model_id TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    title TEXT,
+    date TEXT,
+    description TEXT,
+    PRIMARY KEY (model_id, run_date, position)
+);
+
+-- 分析用にモデル ID へ整数の通し番号を割り当てる（統計を文字列を介さずに配列へ読み込む）
+CREATE TABLE IF NOT EXISTS model_ids (
+    ordinal INTEGER PRIMARY KEY,
+    model_id TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS commit_cursors (
+    model_id TEXT PRIMARY KEY,
+    commit_id TEXT NOT NULL,
+    commits TEXT NOT NULL DEFAULT '[]',
+    updated_at TEXT NOT NULL
+);
+"""
+
+
+# 1日分の統計を読み込む構造化配列の型
+STATS_DTYPE = np.dtype([("model", "<i8"), ("downloads", "<i8"), ("likes", "<i8")])
+
+
+def _format_last_modified(value) -> str:
+    return value.isoformat() if isinstance(value, datetime) else (value or "")
+
+
+class SnapshotStore:
+    """実行日ごとのモデル統計を保存する SQLite ストア"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or Config.SNAPSHOT_DB)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        with self.conn:
+            # 通し番号の導入前に作成されたデータベースは既存のモデル ID から採番する
+            if self.conn.execute("SELECT 1 FROM model_ids LIMIT 1").fetchone() is None:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO model_ids (model_id) "
+                    "SELECT DISTINCT model_id FROM model_snapshots"
+                )
+
+    def save_models(
+        self,
+        models: Iterable[HuggingFaceModel],
+        run_date: Optional[str] = None,
+        with_commits: bool = True,
+    ) -> int:
+        """モデルのスナップショットを保存（同じ実行日の行は上書き）
+
+        with_commits=False の場合は統計のみを更新する。同じ日の行の lastModified が
+        変わった場合は、保存済みのコミットが古くなるため削除して未取得の扱いに戻す。
+        """
+        run_date = run_date or date.today().isoformat()
+        snapshot_rows = []
+        commit_rows = []
+        # トレンドと人気の両方に含まれるモデルは1行にまとめる
+        unique_models = {model.id: model for model in models}
+        for model in unique_models.values():
+            snapshot_rows.append(
+                (
+                    model.id,
+                    run_date,
+                    model.author,
+                    model.stats.downloads,
+                    model.stats.likes,
+                    json.dumps(list(model.tags), ensure_ascii=False),
+                    _format_last_modified(model.last_modified),
+                    int(bool(model.private)),
+                    int(with_commits),
+                )
+            )
+            if not with_commits:
+                continue
+            for position, commit in enumerate(model.recent_commits):
+                commit_rows.append(
+                    (
+                        model.id,
+                        run_date,
+                        position,
+                        commit.title,
+                        commit.date.isoformat(),
+                        commit.description,
+                    )
+                )
+
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO model_ids (model_id) VALUES (?)",
+                [(row[0],) for row in snapshot_rows],
+            )
+            self.conn.executemany(
+                "INSERT INTO model_snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (model_id, run_date) DO UPDATE SET "
+                "author = excluded.author, downloads = excluded.downloads, "
+                "likes = excluded.likes, tags = excluded.tags, "
+                "last_modified = excluded.last_modified, private = excluded.private, "
+                # SET の右辺は更新前の値を参照する
+                "commits_fetched = CASE "
+                "WHEN excluded.commits_fetched = 1 THEN 1 "
+                "WHEN last_modified IS excluded.last_modified THEN commits_fetched "
+                "ELSE 0 END",
+                snapshot_rows,
+            )
+            if not with_commits:
+                self.conn.executemany(
+                    "DELETE FROM model_commits WHERE model_id = ? AND run_date = ? "
+                    "AND NOT EXISTS (SELECT 1 FROM model_snapshots "
+                    "WHERE model_id = ? AND run_date = ? AND commits_fetched = 1)",
+                    [(row[0], row[1], row[0], row[1]) for row in snapshot_rows],
+                )
+            else:
+                # コミットは実行日単位で置き換える
+                self.conn.executemany(
+                    "DELETE FROM model_commits WHERE model_id = ? AND run_date = ?",
+                    [(row[0], row[1]) for row in snapshot_rows],
+                )
+                self.conn.executemany(
+                    "INSERT INTO model_commits VALUES (?, ?, ?, ?, ?, ?)", commit_rows
+                )
+        return len(snapshot_rows)
+
+    def latest_snapshot(
+        self, model_id: str, with_commits: bool = False
+    ) -> Optional[dict]:
+        """モデルの直近のスナップショットを取得（with_commits=True ならコミット取得済みのもの）"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT run_date, downloads, likes, tags, last_modified "
+                "FROM model_snapshots WHERE model_id = ? AND commits_fetched >= ? "
+                "ORDER BY run_date DESC LIMIT 1",
+                (model_id, int(with_commits)),
+            ).fetchone()
+            if not row:
+                return None
+            commits = self.conn.execute(
+                "SELECT title, date, description FROM model_commits "
+                "WHERE model_id = ? AND run_date = ? ORDER BY position",
+                (model_id, row[0]),
+            ).fetchall()
+
+        return {
+            "run_date": row[0],
+            "downloads": row[1],
+            "likes": row[2],
+            "tags": json.loads(row[3]),
+            "last_modified": row[4],
+            "recent_commits": [
+                ModelCommit(
+                    title=title,
+                    date=datetime.fromisoformat(commit_date),
+                    description=description,
+                )
+                for title, commit_date, description in commits
+            ],
+        }
+
+    def unchanged_commits(self, model: HuggingFaceModel) -> Optional[List[ModelCommit]]:
+        """lastModified が前回から変わっていなければ保存済みのコミットを返す"""
+        last_modified = _format_last_modified(model.last_modified)
+        if not last_modified:
+            return None
+        snapshot = self.latest_snapshot(model.id, with_commits=True)
+        if not snapshot or snapshot["last_modified"] != last_modified:
+            return None
+        return snapshot["recent_commits"]
+
+    def commit_cursor(self, model_id: str) -> Optional[Tuple[str, List[ModelCommit]]]:
+        """前回取得した最新コミットの ID と、その時点の最近のコミット一覧"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT commit_id, commits FROM commit_cursors WHERE model_id = ?",
+                (model_id,),
+            ).fetchone()
+        if not row:
+            return None
+        return row[0], [
+            ModelCommit(title=c["title"], date=c["date"], description=c["description"])
+            for c in json.loads(row[1])
+        ]
+
+    def save_commit_cursor(
+        self, model_id: str, commit_id: str, commits: List[ModelCommit]
+    ) -> None:
+        """最新コミットの ID と最近のコミット一覧を保存（次回はこのコミットで取得を打ち切る）"""
+        data = [
+            {"title": c.title, "date": c.date.isoformat(), "description": c.description}
+            for c in commits
+        ]
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO commit_cursors VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (model_id) DO UPDATE SET commit_id = excluded.commit_id, "
+                "commits = excluded.commits, updated_at = excluded.updated_at",
+                (model_id, commit_id, json.dumps(data, ensure_ascii=False), datetime.now().isoformat()),
+            )
+
+    def history(self, model_id: str) -> List[Dict]:
+        """モデルの統計の推移を実行日順に取得"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT run_date, downloads, likes FROM model_snapshots "
+                "WHERE model_id = ? ORDER BY run_date",
+                (model_id,),
+            ).fetchall()
+        return [
+            {"run_date": run_date, "downloads": downloads, "likes": likes}
+            for run_date, downloads, likes in rows
+        ]
+
+    def stats_arrays(
+        self, start_date: str, end_date: str, dates: Optional[Iterable[str]] = None
+    ) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """期間内の統計を (モデル ID, 行番号, 日付, ダウンロード数, いいね数) の配列で取得
+
+        行番号は返したモデル ID 一覧の位置、日付は datetime64[D]。日付ごとに整数の通し番号で
+        問い合わせて配列へ直接読み込み、行ごとの文字列や Python のリストを保持しない。
+        dates を指定した場合は期間内のその日付だけを読み込む。
+        """
+        days = np.arange(
+            np.datetime64(start_date, "D"), np.datetime64(end_date, "D") + 1, dtype="datetime64[D]"
+        )
+        if dates is not None:
+            days = np.intersect1d(days, np.asarray(list(dates), dtype="datetime64[D]"))
+        chunks = []
+        with self._lock:
+            for day in days:
+                cursor = self.conn.execute(
+                    "SELECT i.ordinal, s.downloads, s.likes FROM model_snapshots AS s "
+                    "JOIN model_ids AS i ON i.model_id = s.model_id WHERE s.run_date = ?",
+                    (str(day),),
+                )
+                records = np.fromiter(cursor, dtype=STATS_DTYPE)
+                if len(records):
+                    chunks.append((day, records))
+            if not chunks:
+                empty = np.empty(0, dtype=np.int64)
+                return [], empty, empty.astype("datetime64[D]"), empty, empty
+            ordinals, rows = np.unique(
+                np.concatenate([records["model"] for _, records in chunks]), return_inverse=True
+            )
+            names = dict(
+                self.conn.execute(
+                    "SELECT ordinal, model_id FROM model_ids WHERE ordinal BETWEEN ? AND ?",
+                    (int(ordinals[0]), int(ordinals[-1])),
+                )
+            )
+
+        run_dates = np.concatenate(
+            [np.full(len(records), day, dtype="datetime64[D]") for day, records in chunks]
+        )
+        downloads = np.concatenate([records["downloads"] for _, records in chunks])
+        likes = np.concatenate([records["likes"] for _, records in chunks])
+        model_ids = [names[ordinal] for ordinal in ordinals.tolist()]
+        return model_ids, rows.astype(np.int64), run_dates, downloads, likes
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,271 @@
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from config import Config
+from models.huggingface import HuggingFaceModel, TrendReason
+from services.snapshot import SnapshotStore
+
+
+class TrendSeries:
+    """モデル×日付のダウンロード数・いいね数を保持する列指向の時系列
+
+    downloads / likes は (モデル数, 日数) の float64 配列で、日付の軸は start から end までの
+    暦日（実行しなかった日も列を持ち、NaN になる）。列の差がそのまま日数を表す。
+    offsets を持つ場合は、末尾の日付から offsets[i] 日前の日付だけを i 列目に持つ。
+    """
+
+    def __init__(
+        self,
+        model_ids: Sequence[str],
+        dates: Sequence[str],
+        downloads: np.ndarray,
+        likes: np.ndarray,
+        observed_dates: Optional[int] = None,
+        offsets: Optional[Sequence[int]] = None,
+    ):
+        self.model_ids = list(model_ids)
+        self.dates = list(dates)
+        self.offsets = list(offsets) if offsets is not None else None
+        # 実際にスナップショットが存在する日数
+        self.observed_dates = len(self.dates) if observed_dates is None else observed_dates
+        self.index: Dict[str, int] = {model_id: i for i, model_id in enumerate(self.model_ids)}
+        self.downloads = downloads
+        self.likes = likes
+
+    def column(self, matrix: np.ndarray, offset: int) -> np.ndarray:
+        """末尾の日付から offset 日前の列（範囲外・未読み込みなら NaN）"""
+        if self.offsets is not None:
+            if offset not in self.offsets:
+                return np.full(matrix.shape[0], np.nan, dtype=matrix.dtype)
+            return matrix[:, self.offsets.index(offset)]
+        if matrix.shape[1] <= offset:
+            return np.full(matrix.shape[0], np.nan, dtype=matrix.dtype)
+        return matrix[:, -1 - offset]
+
+    @classmethod
+    def from_rows(
+        cls,
+        model_ids: Sequence[str],
+        run_dates: Sequence[str],
+        downloads: Sequence[float],
+        likes: Sequence[float],
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> "TrendSeries":
+        """(model_id, run_date, downloads, likes) の列から start〜end の暦日の時系列を構築
+
+        start / end を省略した場合はデータ中の最初と最後の日付を使う。
+        """
+        ids, model_idx = np.unique(np.asarray(model_ids, dtype=object), return_inverse=True)
+        return cls.from_arrays(
+            ids.tolist(),
+            model_idx,
+            np.asarray(run_dates, dtype="datetime64[D]"),
+            np.asarray(downloads),
+            np.asarray(likes),
+            start=start,
+            end=end,
+        )
+
+    @classmethod
+    def from_arrays(
+        cls,
+        model_ids: Sequence[str],
+        rows: np.ndarray,
+        run_dates: np.ndarray,
+        downloads: np.ndarray,
+        likes: np.ndarray,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        offsets: Optional[Sequence[int]] = None,
+    ) -> "TrendSeries":
+        """行番号（model_ids の位置）と datetime64[D] の日付の配列から時系列を構築
+
+        offsets を指定した場合は end から offsets 日前の日付だけを列にし、他の日付の行は捨てる。
+        """
+        if not len(run_dates) and (start is None or end is None):
+            return cls([], [], np.empty((0, 0)), np.empty((0, 0)), 0, offsets)
+        first = np.datetime64(start, "D") if start else run_dates.min()
+        last = np.datetime64(end, "D") if end else run_dates.max()
+        if offsets is None:
+            dates = np.arange(first, last + 1, dtype="datetime64[D]")
+            date_idx = (run_dates - first).astype(np.int64)
+        else:
+            dates = last - np.asarray(offsets, dtype="timedelta64[D]")
+            # 日付から列番号への対応表（期間内の日数ぶん、対象外の日付は -1）
+            lookup = np.full((last - first).astype(np.int64) + 1, -1, dtype=np.int64)
+            in_window = dates >= first
+            lookup[(dates[in_window] - first).astype(np.int64)] = np.flatnonzero(in_window)
+            date_idx = lookup[(run_dates - first).astype(np.int64)]
+            keep = date_idx >= 0
+            rows, date_idx = rows[keep], date_idx[keep]
+            downloads, likes = downloads[keep], likes[keep]
+
+        # float32 では 2^24 を超えるダウンロード数の差が丸められるため float64 で保持する
+        shape = (len(model_ids), len(dates))
+        downloads_matrix = np.full(shape, np.nan, dtype=np.float64)
+        likes_matrix = np.full(shape, np.nan, dtype=np.float64)
+        downloads_matrix[rows, date_idx] = downloads
+        likes_matrix[rows, date_idx] = likes
+
+        observed = np.zeros(len(dates), dtype=bool)
+        observed[date_idx] = True
+        return cls(
+            model_ids,
+            [str(day) for day in dates],
+            downloads_matrix,
+            likes_matrix,
+            observed_dates=int(observed.sum()),
+            offsets=offsets,
+        )
+
+    @classmethod
+    def from_snapshot_store(
+        cls,
+        store: SnapshotStore,
+        days: Optional[int] = None,
+        end_date: Optional[str] = None,
+        offsets: Optional[Iterable[int]] = None,
+    ) -> "TrendSeries":
+        """スナップショットストアから直近 days 日分の時系列を読み込む
+
+        offsets（end_date から何日前か）を指定した場合はその日付だけを読み込み、
+        行列もその日付の列だけを持つ。
+        """
+        end = date.fromisoformat(end_date) if end_date else date.today()
+        start = end - timedelta(days=(days or Config.TREND_WINDOW_DAYS) - 1)
+        dates = None
+        if offsets is not None:
+            offsets = tuple(offsets)
+            dates = [(end - timedelta(days=offset)).isoformat() for offset in offsets]
+        arrays = store.stats_arrays(start.isoformat(), end.isoformat(), dates=dates)
+        return cls.from_arrays(
+            *arrays, start=start.isoformat(), end=end.isoformat(), offsets=offsets
+        )
+
+    def __len__(self) -> int:
+        return len(self.model_ids)
+
+
+# TrendAnalytics が参照する列（末尾から何日前か）
+ANALYTICS_OFFSETS = (0, 1, 2, 7)
+
+
+def _rank(values: np.ndarray) -> np.ndarray:
+    """値の降順での順位（1始まり、NaN は最下位）"""
+    filled = np.where(np.isnan(values), -np.inf, values)
+    order = np.argsort(-filled, kind="stable")
+    ranks = np.empty(len(values), dtype=np.int64)
+    ranks[order] = np.arange(1, len(values) + 1)
+    return ranks
+
+
+class TrendAnalytics:
+    """カタログ全体の成長率・加速度・順位変動をまとめて計算する"""
+
+    def __init__(self, series: TrendSeries):
+        self.series = series
+        downloads = series.downloads
+        likes = series.likes
+
+        column = series.column
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            latest = column(downloads, 0)
+            previous = column(downloads, 1)
+            week_ago = column(downloads, 7)
+
+            self.downloads_dod = latest - previous
+            self.downloads_dod_prev = previous - column(downloads, 2)
+            self.downloads_acceleration = self.downloads_dod - self.downloads_dod_prev
+            self.downloads_7d = latest - week_ago
+            self.downloads_7d_pct = np.where(week_ago > 0, self.downloads_7d / week_ago, np.nan)
+
+            self.likes_dod = column(likes, 0) - column(likes, 1)
+            self.likes_7d = column(likes, 0) - column(likes, 7)
+
+        self.rank = _rank(latest)
+        previous_rank = _rank(previous)
+        self.rank_change = np.where(np.isnan(previous), 0, previous_rank - self.rank)
+
+    @classmethod
+    def from_snapshot_store(
+        cls, store: SnapshotStore, days: Optional[int] = None
+    ) -> Optional["TrendAnalytics"]:
+        # 参照する日付の列だけを読み込み、期間やカタログの規模に比例した読み込みを避ける
+        series = TrendSeries.from_snapshot_store(store, days=days, offsets=ANALYTICS_OFFSETS)
+        return cls(series) if len(series) and series.observed_dates >= 2 else None
+
+    def metrics_for(self, model_id: str) -> Optional[dict]:
+        """モデル1件分の指標を取得"""
+        i = self.series.index.get(model_id)
+        if i is None:
+            return None
+        return {
+            "downloads_dod": float(self.downloads_dod[i]),
+            "downloads_7d": float(self.downloads_7d[i]),
+            "downloads_7d_pct": float(self.downloads_7d_pct[i]),
+            "downloads_acceleration": float(self.downloads_acceleration[i]),
+            "likes_dod": float(self.likes_dod[i]),
+            "likes_7d": float(self.likes_7d[i]),
+            "rank": int(self.rank[i]),
+            "rank_change": int(self.rank_change[i]),
+        }
+
+    def reasons_for(self, model_id: str) -> List[TrendReason]:
+        """成長指標からトレンド理由を作成"""
+        metrics = self.metrics_for(model_id)
+        if not metrics:
+            return []
+
+        reasons = []
+        growth_pct = metrics["downloads_7d_pct"]
+        if not np.isnan(growth_pct) and growth_pct >= Config.TREND_GROWTH_THRESHOLD:
+            reasons.append(
+                TrendReason(
+                    type="growth",
+                    description=(
+                        f"🚀 Downloads +{growth_pct:.0%} in 7 days "
+                        f"(+{metrics['downloads_7d']:,.0f})"
+                    ),
+                )
+            )
+
+        if metrics["downloads_dod"] > 0 and metrics["downloads_acceleration"] > 0:
+            reasons.append(
+                TrendReason(
+                    type="acceleration",
+                    description=(
+                        f"⚡ Accelerating: +{metrics['downloads_dod']:,.0f} downloads today "
+                        f"(+{metrics['downloads_acceleration']:,.0f} vs. yesterday's gain)"
+                    ),
+                )
+            )
+
+        if metrics["rank_change"] >= Config.TREND_RANK_CHANGE_THRESHOLD:
+            reasons.append(
+                TrendReason(
+                    type="rank",
+                    description=(
+                        f"📊 Rank #{metrics['rank']:,} "
+                        f"(up {metrics['rank_change']:,} since yesterday)"
+                    ),
+                )
+            )
+
+        if metrics["likes_7d"] > 0 and metrics["likes_dod"] > 0:
+            reasons.append(
+                TrendReason(
+                    type="likes",
+                    description=f"❤️ +{metrics['likes_7d']:,.0f} likes in 7 days",
+                )
+            )
+
+        return reasons
+
+    def annotate(self, models: Iterable[HuggingFaceModel]) -> None:
+        """モデルのトレンド理由に成長指標を追加"""
+        for model in models:
+            model.trend_reasons.extend(self.reasons_for(model.id))